@@ -1,11 +1,18 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
-import holidays
-import plotly.graph_objects as go
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
 from io import BytesIO
-import zipfile
+from pathlib import Path
+import contextlib
+import functools
+import multiprocessing
+import os
+import time
+
+# Only light modules are imported here. pandas, Plotly and the analysis core
+# are imported by the functions using them, so the upload page starts without them
+from timesheet.jobs import BackgroundJobs
+from timesheet.profiling import PROFILE_MODES, Profiler, span
 
 # Page configuration
 st.set_page_config(
@@ -15,611 +22,819 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-class TimesheetAnalyzer:
-    def __init__(self):
-        self.df = None
-        self.cz_holidays = holidays.CZ()
-        self.categories = {
-            'Jobs': ['jobs', 'job'],
-            'Reviews': ['review'],
-            'Hiring': ['hiring', 'interview']
-        }
-
-    def load_data(self, df):
-        self.df = df
-        self.df['Datum'] = pd.to_datetime(self.df['Datum'])
-
-    def get_working_hours_for_month(self, year, month):
-        first_day = datetime(year, month, 1)
-        if month == 12:
-            last_day = datetime(year + 1, 1, 1) - timedelta(days=1)
+# Directory of the local Parquet history store, history is disabled when unset
+STORE_DIR = os.environ.get('TIMESHEET_STORE_DIR')
+# SQLite (or *.duckdb) file of the history store, takes precedence over STORE_DIR;
+# history is then analyzed in the database instead of being loaded into memory
+SQL_STORE = os.environ.get('TIMESHEET_SQL_STORE')
+
+# Drop folder whose exports are ingested and analyzed in the background, off when unset
+WATCH_DIR = os.environ.get('TIMESHEET_WATCH_DIR')
+# Seconds between two scans of the drop folder
+WATCH_INTERVAL = float(os.environ.get('TIMESHEET_WATCH_INTERVAL', 30))
+
+# Accepted upload types, the keys of timesheet.TIMESHEET_READERS (importing it would load pandas)
+UPLOAD_TYPES = ['xlsx', 'csv']
+
+# Number of uploaded files whose parsed data and analyses are kept in memory
+# (shared across sessions, least recently used entries are evicted first)
+INGEST_CACHE_ENTRIES = 8
+
+# Keep loaded data in the compact representation by default (large multi-year loads)
+COMPACT_BY_DEFAULT = os.environ.get('TIMESHEET_COMPACT', '') not in ('', '0')
+
+# Team selector option combining the OPS projects of all teams
+ALL_TEAMS = "Všechny týmy"
+
+# Show the performance panel switched on by default (e.g. when diagnosing production)
+PROFILE_BY_DEFAULT = os.environ.get('TIMESHEET_PROFILE', '') not in ('', '0')
+
+
+@st.cache_resource(show_spinner=False)
+def get_parse_pool():
+    """Worker processes parsing uploads in parallel, None on a single CPU"""
+    # Excel parsing holds the GIL, so only separate processes parse files side by side
+    workers = min(os.cpu_count() or 1, 4)
+    if workers < 2:
+        return None
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+
+
+@st.cache_resource(show_spinner=False)
+def get_parse_jobs():
+    """Parsed uploads by content hash, shared across sessions"""
+    return BackgroundJobs(max_workers=4, max_entries=4 * INGEST_CACHE_ENTRIES)
+
+
+def parse_upload(job, pool, file_type, file_bytes):
+    from timesheet import read_timesheet
+
+    job.report(0.1, "načítám...")
+    if pool is None:
+        return read_timesheet(BytesIO(file_bytes), file_type)
+    return pool.submit(read_timesheet, BytesIO(file_bytes), file_type).result()
+
+
+def load_uploaded_files(uploaded_files):
+    """Parse the uploaded files concurrently (each once per content).
+
+    Returns the data key of the files that parsed and a function merging
+    them, called by get_analyzer only when no analyzer is cached for the key;
+    files failing validation are reported in the sidebar and left out.
+    """
+    from timesheet import get_file_hash, merge_timesheets
+
+    jobs = get_parse_jobs()
+    pool = get_parse_pool()
+    parsing = {}
+    for uploaded_file in sorted(uploaded_files, key=lambda uploaded_file: uploaded_file.name):
+        file_bytes = uploaded_file.getvalue()
+        file_hash = get_file_hash(file_bytes)
+        job = jobs.submit(('parse', file_hash), parse_upload, pool, Path(uploaded_file.name).suffix, file_bytes)
+        parsing[uploaded_file.name] = (file_hash, job)
+
+    # Per-file progress until the slowest file is parsed
+    if not all(job.done() for _, job in parsing.values()):
+        progress_bars = {name: st.progress(0.0, text=f"📄 {name}") for name in parsing}
+        while True:
+            for name, (_, job) in parsing.items():
+                state = "hotovo" if job.done() else job.message or "čeká..."
+                progress_bars[name].progress(1.0 if job.done() else job.progress, text=f"📄 {name}: {state}")
+            if all(job.done() for _, job in parsing.values()):
+                break
+            time.sleep(0.2)
+        for progress_bar in progress_bars.values():
+            progress_bar.empty()
+
+    parsed = {}
+    for name, (file_hash, job) in parsing.items():
+        if job.failed():
+            st.sidebar.warning(f"⚠️ {name}: {job.future.exception()}")
         else:
-            last_day = datetime(year, month + 1, 1) - timedelta(days=1)
-
-        working_days = 0
-        current_day = first_day
-        while current_day <= last_day:
-            if current_day.weekday() < 5 and current_day not in self.cz_holidays:
-                working_days += 1
-            current_day += timedelta(days=1)
-        return working_days * 8
-
-    def calculate_fte(self, hours, date):
-        year = date.year
-        month = date.month
-        monthly_hours = self.get_working_hours_for_month(year, month)
-        return round(hours / monthly_hours, 2)
-
-    def analyze_by_project(self):
-        unique_months = pd.Period(self.df['Datum'].min(), freq='M')
-        working_hours = self.get_working_hours_for_month(unique_months.year, unique_months.month)
-
-        project_analysis = (
-            self.df
-            .groupby(['Projekt'])
-            .agg({
-                'Natrackováno': ['sum', 'mean', 'count']
-            })
-            .round(2)
-        )
+            parsed[file_hash] = job.result()
+    if not parsed:
+        raise ValueError("Žádný z nahraných souborů se nepodařilo načíst")
 
-        project_analysis.columns = ['Celkem hodin', 'Průměr hodin', 'Počet záznamů']
+    if len(parsed) == 1:
+        data_key, df = next(iter(parsed.items()))
+        # The parsed frame stays cached for the next upload, the analyzer gets a copy
+        return data_key, df.copy
+    frames = list(parsed.values())
+    return get_file_hash(''.join(sorted(parsed)).encode()), lambda: merge_timesheets(frames)
 
-        project_analysis['FTE'] = project_analysis['Celkem hodin'].apply(
-            lambda x: self.calculate_fte(x, unique_months.to_timestamp())
-        )
 
-        total_hours = round(project_analysis['Celkem hodin'].sum(), 2)
-        project_analysis['Podíl (%)'] = (project_analysis['Celkem hodin'] / total_hours * 100).round(2)
-
-        total_row = pd.DataFrame({
-            'Celkem hodin': [total_hours],
-            'Průměr hodin': [round(project_analysis['Průměr hodin'].mean(), 2)],
-            'Počet záznamů': [int(project_analysis['Počet záznamů'].sum())],
-            'FTE': [round(project_analysis['FTE'].sum(), 2)],
-            'Podíl (%)': [100.0]
-        }, index=['CELKEM'])
-
-        project_analysis = pd.concat([project_analysis, total_row])
-        project_analysis = project_analysis.round(2)
-        project_analysis['Počet záznamů'] = project_analysis['Počet záznamů'].astype(int)
-        return project_analysis, working_hours, unique_months
-
-    def _get_ops_project(self):
-        ops_projects = [proj for proj in self.df['Projekt'].unique()
-                       if 'ops' in proj.lower() and 'design' in proj.lower()]
-        if not ops_projects:
-            raise ValueError("Nenalezen žádný OPS projekt v datech")
-        return ops_projects[0]
-
-    def analyze_ops_activities(self):
-        ops_project = self._get_ops_project()
-        ops_data = self.df[self.df['Projekt'] == ops_project].copy()
-
-        def categorize_description(desc):
-            if pd.isna(desc):
-                return 'Nespárované'
-            desc = str(desc).lower()
-            for category, keywords in self.categories.items():
-                if any(keyword in desc for keyword in keywords):
-                    return category
-            return 'Nespárované'
-
-        ops_data['Kategorie'] = ops_data['Popis'].apply(categorize_description)
-
-        category_analysis = ops_data.groupby('Kategorie').agg({
-            'Natrackováno': 'sum'
-        }).round(2)
-
-        total_hours = round(category_analysis['Natrackováno'].sum(), 2)
-        category_analysis['Podíl (%)'] = (category_analysis['Natrackováno'] / total_hours * 100).round(2)
-
-        total_row = pd.DataFrame({
-            'Natrackováno': [total_hours],
-            'Podíl (%)': [100.0]
-        }, index=['CELKEM'])
-
-        category_analysis = pd.concat([category_analysis, total_row])
-        category_analysis = category_analysis.round(2)
-        return category_analysis
-
-    def analyze_ops_by_person(self):
-        ops_project = self._get_ops_project()
-        ops_data = self.df[self.df['Projekt'] == ops_project].copy()
-
-        def categorize_description(desc):
-            if pd.isna(desc):
-                return 'Nespárované'
-            desc = str(desc).lower()
-            for category, keywords in self.categories.items():
-                if any(keyword in desc for keyword in keywords):
-                    return category
-            return 'Nespárované'
-
-        ops_data['Kategorie'] = ops_data['Popis'].apply(categorize_description)
-
-        person_category_analysis = ops_data.pivot_table(
-            values='Natrackováno',
-            index='Osoba',
-            columns='Kategorie',
-            aggfunc='sum',
-            fill_value=0
-        ).round(2)
-
-        person_category_analysis['Celkem'] = person_category_analysis.sum(axis=1).round(2)
-        total_hours = round(person_category_analysis['Celkem'].sum(), 2)
-        person_category_analysis['Podíl (%)'] = (person_category_analysis['Celkem'] / total_hours * 100).round(2)
-
-        person_category_analysis = person_category_analysis.round(2)
-        return person_category_analysis
-
-    def get_person_fte(self):
-        unique_months = pd.Period(self.df['Datum'].min(), freq='M')
-        person_fte = self.df.groupby('Osoba')['Natrackováno'].sum().apply(
-            lambda x: self.calculate_fte(x, unique_months.to_timestamp())
-        ).sort_values()
-        return person_fte
-
-
-def create_bar_chart(x_data, y_data, title, xaxis_title, text_data, main_color='#FF7CAC'):
-    max_value = max(x_data)
-    fig = go.Figure(data=[go.Bar(
-        x=x_data,
-        y=y_data,
-        orientation='h',
-        marker_color=main_color,
-        text=text_data,
-        textposition='outside',
-        textfont=dict(color='#333333', size=12)
-    )])
-    fig.update_layout(
-        title=dict(text=title, font=dict(color='#333333', size=18)),
-        xaxis_title=xaxis_title,
-        xaxis=dict(
-            range=[0, max_value * 1.4],
-            showgrid=True,
-            gridcolor='lightgrey',
-            gridwidth=1,
-            zeroline=True,
-            zerolinecolor='lightgrey',
-            zerolinewidth=1,
-            title=dict(font=dict(color='#333333', size=14)),
-            tickfont=dict(color='#333333', size=12)
-        ),
-        yaxis=dict(
-            showgrid=True,
-            gridcolor='lightgrey',
-            gridwidth=1,
-            tickfont=dict(color='#333333', size=12)
-        ),
-        margin=dict(l=250, r=500),
-        showlegend=True,
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        hoverlabel=dict(bgcolor='white'),
-        width=1200,
-        height=400,
-        font=dict(color='#333333')
+@st.cache_resource(show_spinner=False)
+def get_timesheet_store():
+    if SQL_STORE:
+        from timesheet import SqlTimesheetStore
+
+        return SqlTimesheetStore(SQL_STORE)
+    if STORE_DIR:
+        from timesheet import TimesheetStore
+
+        return TimesheetStore(STORE_DIR)
+    return None
+
+
+@st.cache_resource(show_spinner=False)
+def get_folder_watcher():
+    """Watcher of the drop folder shared by all sessions, new exports are also added to the history"""
+    from timesheet import FolderWatcher
+
+    return FolderWatcher(WATCH_DIR, WATCH_INTERVAL, store=get_timesheet_store(), compact=COMPACT_BY_DEFAULT).start()
+
+
+def watch_status(watcher):
+    st.sidebar.header("📂 Sledovaná složka")
+    st.sidebar.caption(f"{watcher.folder} – kontrola každých {watcher.interval:g} s")
+    if watcher.error:
+        st.sidebar.warning(f"⚠️ {watcher.error}")
+    for name, message in watcher.errors.items():
+        st.sidebar.warning(f"⚠️ {name}: {message}")
+    if watcher.updated_at is None:
+        st.sidebar.info("⏳ Načítám exporty ze složky...")
+    else:
+        st.sidebar.success(f"✅ Souborů: {len(watcher.files)}, aktualizováno {watcher.updated_at:%d.%m. %H:%M}")
+
+
+@st.cache_resource(max_entries=INGEST_CACHE_ENTRIES, show_spinner="Počítám historii v databázi...")
+def get_sql_analyzer(store_version, start, end):
+    """Analyzer of the SQL history store, aggregations run in the database"""
+    from timesheet import TimesheetAnalyzer
+
+    analyzer = TimesheetAnalyzer()
+    analyzer.load_from_sql(get_timesheet_store(), start, end)
+    return analyzer
+
+
+@st.cache_resource(max_entries=INGEST_CACHE_ENTRIES, show_spinner="Načítám data...")
+def get_analyzer(data_key, _load, compact=False):
+    """Analyzer of the data under data_key, _load() gives its frame and runs only on a cache miss"""
+    from timesheet import TimesheetAnalyzer
+
+    analyzer = TimesheetAnalyzer()
+    analyzer.load_data(_load(), compact=compact)
+    return analyzer
+
+
+@st.cache_data(max_entries=INGEST_CACHE_ENTRIES, show_spinner="Analyzuji data...")
+def get_analysis_results(file_hash, _analyzer, start=None, end=None):
+    """Run all analyses for the uploaded file and period, cached by its content hash"""
+    project_data, working_hours, months = _analyzer.analyze_by_project(start, end)
+    results = {
+        'project_data': project_data,
+        'working_hours': working_hours,
+        'months': months,
+        'person_fte': _analyzer.get_person_fte(start, end),
+        'project_monthly_fte': _analyzer.analyze_monthly_fte('Projekt', start, end),
+        'person_monthly_fte': _analyzer.analyze_monthly_fte('Osoba', start, end),
+        'project_month_over_month': _analyzer.analyze_month_over_month('Projekt', start, end),
+        'person_month_over_month': _analyzer.analyze_month_over_month('Osoba', start, end),
+        'ops_teams': [],
+        'ops_error': None
+    }
+    try:
+        # The cube holds OPS hours of all teams, switching teams or periods only slices it
+        results['ops_teams'] = _analyzer.get_teams()
+    except ValueError as e:
+        results['ops_error'] = str(e)
+    return results
+
+
+def get_default_team(teams):
+    """Team whose OPS activities are shown first when the export contains several teams"""
+    return next((team for team in teams if 'design' in team.lower()), teams[0])
+
+
+def get_default_planned_fte(person):
+    default_value = 1.0
+    if 'Chvojka' in person:
+        default_value = 0.9
+    elif 'Martínek' in person:
+        default_value = 0.5
+    elif 'Panáková' in person:
+        default_value = 0.5
+    elif 'Brza' in person:
+        default_value = 1.0
+    elif 'Vybíral' in person:
+        default_value = 0.05
+    elif 'Štigler' in person:
+        default_value = 0.05
+    return default_value
+
+
+def get_planned_fte(person_fte):
+    """Current planned FTE values, as edited in planned_fte_section"""
+    return {
+        person: st.session_state.get(f"fte_{person}", get_default_planned_fte(person))
+        for person in person_fte.index
+    }
+
+
+def create_planned_fte_chart(person_fte, planned_fte):
+    from timesheet.charts import create_comparison_chart
+
+    return create_comparison_chart(
+        list(planned_fte.values()),
+        person_fte[list(planned_fte.keys())].values,
+        list(planned_fte.keys())
     )
-    return fig
-
-
-def create_comparison_chart(planned_data, actual_data, labels, main_color='#FF7CAC', light_color='#FFD9E5'):
-    max_value = max(max(planned_data), max(actual_data))
-
-    fig = go.Figure(data=[
-        go.Bar(
-            name='Plánovaný FTE',
-            x=planned_data,
-            y=labels,
-            orientation='h',
-            marker_color=light_color,
-            text=[f"{x:.2f} FTE" for x in planned_data],
-            textposition='outside',
-            textfont=dict(color='#333333', size=12)
-        ),
-        go.Bar(
-            name='Skutečný FTE',
-            x=actual_data,
-            y=labels,
-            orientation='h',
-            marker_color=main_color,
-            text=[f"{x:.2f} FTE" for x in actual_data],
-            textposition='outside',
-            textfont=dict(color='#333333', size=12)
-        )
-    ])
-    fig.update_layout(
-        title=dict(text='Porovnání plánovaného a skutečného FTE', font=dict(color='#333333', size=18)),
-        xaxis_title='FTE',
-        xaxis=dict(
-            range=[0, max_value * 1.4],
-            showgrid=True,
-            gridcolor='lightgrey',
-            gridwidth=1,
-            zeroline=True,
-            zerolinecolor='lightgrey',
-            zerolinewidth=1,
-            title=dict(font=dict(color='#333333', size=14)),
-            tickfont=dict(color='#333333', size=12)
-        ),
-        yaxis=dict(
-            showgrid=True,
-            gridcolor='lightgrey',
-            gridwidth=1,
-            tickfont=dict(color='#333333', size=12)
-        ),
-        barmode='group',
-        margin=dict(l=250, r=500),
-        showlegend=True,
-        plot_bgcolor='white',
-        paper_bgcolor='white',
-        hoverlabel=dict(bgcolor='white'),
-        width=1200,
-        height=400,
-        font=dict(color='#333333'),
-        legend=dict(font=dict(color='#333333', size=12))
+
+
+@st.fragment
+def planned_fte_section(person_fte):
+    """Planned FTE inputs with the comparison chart.
+
+    Editing a planned value reruns only this fragment; the data, analyses and
+    other charts of the page are left untouched.
+    """
+    st.subheader("Porovnání plánovaného a skutečného FTE")
+
+    with st.expander("🎯 Plánované FTE"):
+        st.markdown("Upravte plánované FTE pro jednotlivé osoby:")
+        columns = st.columns(3)
+        for i, person in enumerate(person_fte.index):
+            with columns[i % len(columns)]:
+                st.number_input(
+                    person,
+                    min_value=0.0,
+                    max_value=1.0,
+                    value=get_default_planned_fte(person),
+                    step=0.05,
+                    key=f"fte_{person}"
+                )
+
+    fig_comparison = create_planned_fte_chart(person_fte, get_planned_fte(person_fte))
+    st.plotly_chart(fig_comparison, use_container_width=True)
+
+
+@st.cache_resource(show_spinner=False)
+def get_export_jobs():
+    return BackgroundJobs()
+
+
+def build_excel_report(job, analyzer, person_fte, ops_activities, ops_by_person, include_raw, include_monthly,
+                       period):
+    from timesheet import export_to_excel
+
+    job.report(0.1, "Vytvářím Excel report...")
+    return export_to_excel(
+        analyzer, person_fte, ops_activities, ops_by_person,
+        include_raw=include_raw, include_monthly=include_monthly, start=period[0], end=period[1]
     )
-    return fig
 
 
-def export_to_excel(analyzer, person_fte, ops_activities, ops_by_person):
-    output = BytesIO()
-    project_data, _, _ = analyzer.analyze_by_project()
+def build_data_bundle(job, analyzer, person_fte, ops_activities, ops_by_person, file_format, include_raw,
+                      include_monthly, period):
+    from timesheet import export_bundle
 
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        project_data.to_excel(writer, sheet_name='Projekty')
+    job.report(0.1, "Vytvářím balík dat...")
+    return export_bundle(
+        analyzer, person_fte, ops_activities, ops_by_person,
+        file_format=file_format, include_raw=include_raw, include_monthly=include_monthly,
+        start=period[0], end=period[1]
+    )
 
-        person_fte_df = pd.DataFrame({
-            'Osoba': person_fte.index,
-            'FTE': person_fte.values
-        })
-        person_fte_df.loc[len(person_fte_df)] = ['CELKEM', round(person_fte.sum(), 2)]
-        person_fte_df['FTE'] = person_fte_df['FTE'].round(2)
-        person_fte_df.to_excel(writer, sheet_name='FTE podle osob', index=False)
 
-        ops_activities.to_excel(writer, sheet_name='OPS aktivity')
-        ops_by_person.to_excel(writer, sheet_name='OPS aktivity podle osob')
+def build_charts_zip(job, figures):
+    from timesheet import export_all_charts_as_zip
 
-    output.seek(0)
-    return output
+    return export_all_charts_as_zip(
+        figures,
+        progress=lambda rendered, total: job.report(rendered / total, f"Vykresleno {rendered}/{total} grafů")
+    )
 
 
-def export_all_charts_as_zip(figures_dict):
-    """Export all plotly figures as PNG images in a ZIP file"""
-    try:
-        zip_buffer = BytesIO()
+def render_export(job_key, prepare_label, build, *args):
+    """Start an export only when requested and show its progress until the background job finishes"""
+    jobs = get_export_jobs()
+    job = jobs.get(job_key)
+    if job is None:
+        if not st.button(prepare_label, key=f"prepare_{job_key[0]}"):
+            return None
+        job = jobs.submit(job_key, build, *args)
+
+    # The job keeps running in the worker pool if this run is interrupted,
+    # the next run picks it up again by its key
+    if not job.done():
+        progress_bar = st.progress(job.progress, text=job.message or "Připravuji export...")
+        while not job.done():
+            time.sleep(0.2)
+            progress_bar.progress(job.progress, text=job.message or "Připravuji export...")
+        progress_bar.empty()
+
+    if job.failed():
+        # Forget the failed job so the export can be requested again
+        jobs.discard(job_key)
+    return job
+
+
+@st.fragment
+def export_section(data_key, analyzer, person_fte, ops_activities, ops_by_person, all_figures, period=(None, None)):
+    """Exports are generated on demand and cached by data, period and planned FTE values"""
+    from timesheet.export import BUNDLE_FORMATS
+
+    st.header("📥 Export dat")
+    planned_fte = get_planned_fte(person_fte)
+    all_figures = dict(all_figures)
+    all_figures['04_Porovnani_planovane_vs_skutecne_FTE'] = create_planned_fte_chart(person_fte, planned_fte)
+
+    col1, col2 = st.columns(2)
+    include_raw = col1.checkbox(
+        "Přidat zdrojová data",
+        key='export_raw',
+        help="Všechny záznamy, v Excelu jako list pro každý měsíc"
+    )
+    include_monthly = col2.checkbox("Přidat FTE po měsících", key='export_monthly')
+
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        job = render_export(
+            ('excel', data_key, include_raw, include_monthly),
+            "📄 Připravit Excel report",
+            build_excel_report,
+            analyzer, person_fte, ops_activities, ops_by_person, include_raw, include_monthly, period
+        )
+        if job is not None and job.failed():
+            st.error("Nepodařilo se vytvořit Excel export")
+        elif job is not None:
+            st.download_button(
+                label="📥 Stáhnout Excel report",
+                data=job.result(),
+                file_name=f"timesheet_analysis_{datetime.now().strftime('%Y%m%d')}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
+
+    with col2:
+        # CSV/Parquet files are much faster to write than Excel for large data
+        file_format = st.radio(
+            "Formát dat",
+            BUNDLE_FORMATS,
+            format_func=str.upper,
+            horizontal=True,
+            key='export_bundle_format',
+            label_visibility='collapsed'
+        )
+        job = render_export(
+            ('bundle', data_key, file_format, include_raw, include_monthly),
+            "🗂️ Připravit data (ZIP)",
+            build_data_bundle,
+            analyzer, person_fte, ops_activities, ops_by_person, file_format, include_raw, include_monthly, period
+        )
+        if job is not None and job.failed():
+            st.error("Nepodařilo se vytvořit export dat")
+        elif job is not None:
+            st.download_button(
+                label=f"📥 Stáhnout data ({file_format.upper()})",
+                data=job.result(),
+                file_name=f"timesheet_data_{datetime.now().strftime('%Y%m%d')}.zip",
+                mime="application/zip"
+            )
 
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            for filename, fig in figures_dict.items():
-                # Convert figure to PNG image
-                img_bytes = fig.to_image(format='png', width=1200, height=600)
-                # Add to ZIP file
-                zip_file.writestr(f"{filename}.png", img_bytes)
+    with col3:
+        if all_figures:
+            job = render_export(
+                ('charts', data_key, tuple(sorted(planned_fte.items()))),
+                "🖼️ Připravit grafy (ZIP)",
+                build_charts_zip,
+                all_figures
+            )
+            if job is not None and job.failed():
+                st.warning("⚠️ Export grafů není dostupný na Streamlit Cloud")
+                st.info("💡 Pro export grafů spusťte aplikaci lokálně nebo použijte screenshot")
+            elif job is not None:
+                st.download_button(
+                    label="📊 Stáhnout všechny grafy (ZIP)",
+                    data=job.result(),
+                    file_name=f"timesheet_charts_{datetime.now().strftime('%Y%m%d')}.zip",
+                    mime="application/zip"
+                )
 
-        zip_buffer.seek(0)
-        return zip_buffer
-    except Exception as e:
-        raise Exception(f"Kaleido/Chrome není k dispozici: {str(e)}")
+
+def get_profiler():
+    """Profiler for this run as configured in the sidebar, None when measuring is off"""
+    with st.sidebar.expander("⏱️ Výkon", expanded=PROFILE_BY_DEFAULT):
+        if not st.checkbox("Měřit výkon", value=PROFILE_BY_DEFAULT, key='profile_enabled'):
+            return None
+        track_memory = st.checkbox(
+            "Měřit paměť",
+            key='profile_memory',
+            help="Sleduje alokace přes tracemalloc, výrazně zpomaluje výpočty"
+        )
+        mode = st.selectbox(
+            "Profil volání",
+            [None] + PROFILE_MODES,
+            format_func=lambda mode: mode or "Žádný",
+            key='profile_mode'
+        )
+    return Profiler(track_memory=track_memory, mode=mode)
+
+
+def performance_panel(profiler):
+    """Spans of the last run in the sidebar, downloadable as JSON"""
+    spans = profiler.to_frame()
+    spans['name'] = [' ' * depth + name for depth, name in zip(spans['depth'], spans['name'])]
+    column_config = {
+        'name': st.column_config.TextColumn("Úsek"),
+        'start_s': st.column_config.NumberColumn("Začátek (s)", format="%.3f"),
+        'duration_s': st.column_config.NumberColumn("Trvání (s)", format="%.3f"),
+        'cpu_s': st.column_config.NumberColumn("CPU (s)", format="%.3f"),
+        'peak_memory_mb': st.column_config.NumberColumn("Paměť (MB)", format="%.1f"),
+    }
+    with st.sidebar.expander("⏱️ Výkon posledního běhu", expanded=True):
+        st.dataframe(
+            spans.drop(columns='depth'),
+            column_config=column_config,
+            hide_index=True,
+            use_container_width=True
+        )
+        if profiler.profile:
+            st.code(profiler.profile, language=None)
+        st.download_button(
+            label="📥 Stáhnout měření (JSON)",
+            data=profiler.to_json(),
+            file_name=f"timesheet_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+            mime="application/json"
+        )
 
 
 # Streamlit App
 def main():
-    # Custom CSS to prevent text wrapping in tables
-    st.markdown("""
-        <style>
-        /* Prevent text wrapping in table cells */
-        table td, table th {
-            white-space: nowrap !important;
-            overflow: visible !important;
-            text-overflow: clip !important;
-        }
-        /* Remove horizontal scrollbar and allow table to expand */
-        .stTable {
-            overflow-x: visible !important;
-        }
-        [data-testid="stTable"] {
-            overflow-x: visible !important;
-        }
-        [data-testid="stTable"] > div {
-            overflow-x: visible !important;
-        }
-        /* Allow table to be wider than container */
-        table {
-            width: auto !important;
-            max-width: none !important;
-        }
-        </style>
-    """, unsafe_allow_html=True)
-
     st.title("📊 Timesheet Analyzer")
     st.markdown("Analýza pracovních výkazů Design týmu")
 
     # Sidebar for file upload and settings
     st.sidebar.header("⚙️ Nastavení")
 
-    uploaded_file = st.sidebar.file_uploader(
-        "Nahrajte Excel soubor s timesheety",
-        type=['xlsx'],
-        help="Nahrajte export z Costlocker"
+    uploaded_files = st.sidebar.file_uploader(
+        "Nahrajte Excel soubory s timesheety",
+        type=UPLOAD_TYPES,
+        accept_multiple_files=True,
+        help="Nahrajte jeden nebo více exportů z Costlocker, překrývající se záznamy se sloučí"
+    )
+    compact = st.sidebar.checkbox(
+        "Úsporný režim paměti",
+        value=COMPACT_BY_DEFAULT,
+        help="Ponechá jen potřebné sloupce a uloží texty a hodiny úsporněji, vhodné pro víceleté exporty"
+    )
+
+    # Optional drop folder analyzed in the background, shown when nothing is uploaded
+    watcher = get_folder_watcher() if WATCH_DIR else None
+    if watcher is not None:
+        watch_status(watcher)
+
+    # Optional Parquet or SQL history of previously uploaded exports
+    store = get_timesheet_store()
+    history_range = None
+    save_to_history = False
+    if store is not None:
+        st.sidebar.header("🗄️ Historie")
+        stored_months = store.months()
+        if uploaded_files:
+            save_to_history = st.sidebar.checkbox("Uložit nahrané soubory do historie")
+        elif stored_months and (watcher is None or st.sidebar.radio(
+            "Zdroj dat", ["Sledovaná složka", "Historie"], horizontal=True
+        ) == "Historie"):
+            history_range = st.sidebar.select_slider(
+                "Období z historie",
+                options=stored_months,
+                value=(stored_months[0], stored_months[-1]),
+                format_func=str
+            )
+
+    profiler = get_profiler()
+    with profiler.activate() if profiler is not None else contextlib.nullcontext():
+        with span('Celý běh'):
+            render_report(
+                uploaded_files, history_range, store, save_to_history, compact,
+                watcher if not uploaded_files and history_range is None else None
+            )
+    if profiler is not None:
+        performance_panel(profiler)
+
+
+def tracking_section(analyzer, period):
+    from timesheet.charts import create_heatmap_chart
+    from ui_tables import render_table
+
+    st.header("🩺 Kontrola denního vykazování")
+    daily_hours = analyzer.get_daily_hours(*period)
+    summary, events = analyzer.detect_tracking_anomalies(*period)
+    st.caption(
+        "Chybějící pracovní dny (mezi prvním a posledním vykázaným dnem osoby), pracovní dny od posledního "
+        "záznamu, dny přes 8 h "
+        "a drift: průměr vykázaných dní za posledních 20 pracovních dní (alespoň 10 vykázaných) se od "
+        "průměru prvních 20 vykázaných dní osoby liší o více než 1 h"
+    )
+    render_table(summary, key='tracking_summary')
+    if len(events) > 0:
+        st.subheader("Nalezené odchylky")
+        render_table(events, key='tracking_events', default_sort=('Od', False), hide_index=True)
+    else:
+        st.success("✅ Žádné odchylky ve vykazování")
+    st.plotly_chart(
+        create_heatmap_chart(daily_hours, 'Hodiny podle pracovních dní', 'Hodiny'),
+        use_container_width=True
+    )
+
+
+def select_period(analyzer):
+    """Months to analyze as (start, end), (None, None) for all data"""
+    months = list(analyzer.get_months())
+    if len(months) < 2:
+        return None, None
+    start, end = st.sidebar.select_slider(
+        "Období analýzy",
+        options=months,
+        value=(months[0], months[-1]),
+        format_func=str,
+        help="Tabulky se počítají z předpočítaného souhrnu, změna období je okamžitá"
     )
+    if (start, end) == (months[0], months[-1]):
+        return None, None
+    return str(start), str(end)
 
-    if uploaded_file is not None:
+
+def render_report(uploaded_files, history_range, store, save_to_history, compact, watcher=None):
+    import pandas as pd
+
+    from timesheet import UNMATCHED_CATEGORY, SqlTimesheetStore
+    from timesheet.charts import (
+        create_bar_chart,
+        create_dropdown_bar_chart,
+        create_small_multiples_chart,
+        create_trend_chart,
+    )
+    from ui_tables import render_table
+
+    # The watcher publishes a new analyzer once it is computed, one snapshot serves the whole run
+    data_key, analyzer = watcher.current() if watcher is not None else (None, None)
+    if uploaded_files or history_range is not None or analyzer is not None:
         try:
-            # Load data
-            df = pd.read_excel(uploaded_file)
+            # Load data (parsed and analyzed only once per file content)
+            with span('Načtení dat'):
+                if uploaded_files:
+                    data_key, load = load_uploaded_files(uploaded_files)
+                elif history_range is not None:
+                    store_version = store.version()
+                    data_key = f"history:{store_version}:{history_range[0]}:{history_range[1]}"
+                    if isinstance(store, SqlTimesheetStore):
+                        load = None
+                    else:
+                        # Read only when no analyzer of this version and range is cached
+                        load = functools.partial(store.load, *history_range)
 
             # Initialize analyzer
-            analyzer = TimesheetAnalyzer()
-            analyzer.load_data(df)
-
-            # Get person FTE for sidebar inputs
-            person_fte = analyzer.get_person_fte()
-
-            # Sidebar - Planned FTE inputs
-            st.sidebar.header("🎯 Plánované FTE")
-            st.sidebar.markdown("Upravte plánované FTE pro jednotlivé osoby:")
-
-            planned_fte = {}
-            for person in person_fte.index:
-                default_value = 1.0
-                if 'Chvojka' in person:
-                    default_value = 0.9
-                elif 'Martínek' in person:
-                    default_value = 0.5
-                elif 'Panáková' in person:
-                    default_value = 0.5
-                elif 'Brza' in person:
-                    default_value = 1.0
-                elif 'Vybíral' in person:
-                    default_value = 0.05
-                elif 'Štigler' in person:
-                    default_value = 0.05
-
-                planned_fte[person] = st.sidebar.number_input(
-                    person,
-                    min_value=0.0,
-                    max_value=1.0,
-                    value=default_value,
-                    step=0.05,
-                    key=f"fte_{person}"
-                )
+            with span('Analýzy'):
+                # Drop folder exports come already analyzed by the watcher
+                if analyzer is None and load is None:
+                    analyzer = get_sql_analyzer(store_version, str(history_range[0]), str(history_range[1]))
+                elif analyzer is None:
+                    analyzer = get_analyzer(data_key, load, compact)
+                period = select_period(analyzer)
+                results = get_analysis_results(data_key, analyzer, *period)
+
+            if save_to_history and data_key not in st.session_state.setdefault('stored_files', set()):
+                analyzer.save_to_store(store)
+                st.session_state['stored_files'].add(data_key)
+                st.sidebar.success("✅ Uloženo do historie")
+
+            person_fte = results['person_fte']
 
             # Main content
-            project_data, working_hours, unique_months = analyzer.analyze_by_project()
+            project_data = results['project_data']
+            working_hours = results['working_hours']
+            months = results['months']
+            period_label = str(months[0]) if len(months) == 1 else f"{months[0]} – {months[-1]}"
 
             # Dictionary to store all figures for batch export
             all_figures = {}
 
             # Info box
-            st.info(f"📅 Období: {unique_months} | 💼 Pracovní hodiny: {working_hours}h = 1 FTE")
+            st.info(f"📅 Období: {period_label} | 💼 Pracovní hodiny: {working_hours}h = 1 FTE")
+            if analyzer.memory_footprint is not None:
+                before, after = analyzer.memory_footprint
+                st.caption(f"💾 Data v paměti: {before / 2**20:.1f} MB → {after / 2**20:.1f} MB")
 
             # Project Analysis
-            st.header("📈 Přehled podle projektů")
-
-            col1, col2 = st.columns(2)
-
-            with col1:
-                st.subheader("Tabulka projektů")
-                # Format all numeric columns to 2 decimal places
-                project_data_display = project_data.copy()
-                for col in project_data_display.columns:
-                    if project_data_display[col].dtype in ['float64', 'float32']:
-                        project_data_display[col] = project_data_display[col].apply(lambda x: f"{x:.2f}")
-                st.table(project_data_display)
-
-            with col2:
-                st.subheader("Celkové FTE")
-                total_fte = project_data.loc['CELKEM', 'FTE']
-                st.metric("Celkem FTE", f"{total_fte:.2f}")
-
-            # Visualization: FTE by project
-            st.subheader("FTE a podíl času podle projektů")
-            project_data_sorted = project_data[:-1].sort_values('FTE')
-            fig_fte = create_bar_chart(
-                project_data_sorted['FTE'],
-                project_data_sorted.index,
-                'FTE a podíl času podle projektů',
-                'FTE',
-                [f"{fte:.2f} FTE ({pct:.2f}%)" for fte, pct in
-                 zip(project_data_sorted['FTE'], project_data_sorted['Podíl (%)'])]
-            )
-            all_figures['01_FTE_podle_projektu'] = fig_fte
-            st.plotly_chart(fig_fte, use_container_width=True)
-
-            # Visualization: Hours by project
-            st.subheader("Rozdělení práce mezi projekty")
-            projects_sorted = project_data[:-1].sort_values('Celkem hodin', ascending=True)
-            fig_hours = create_bar_chart(
-                projects_sorted['Celkem hodin'],
-                projects_sorted.index,
-                'Rozdělení práce mezi projekty',
-                'Počet hodin',
-                [f"{hours:.2f}h ({pct:.2f}%)" for hours, pct in
-                 zip(projects_sorted['Celkem hodin'], projects_sorted['Podíl (%)'])]
-            )
-            all_figures['02_Hodiny_podle_projektu'] = fig_hours
-            st.plotly_chart(fig_hours, use_container_width=True)
+            with span('UI: Projekty'):
+                st.header("📈 Přehled podle projektů")
 
-            # Person FTE Analysis
-            st.header("👥 Analýza podle osob")
-
-            col1, col2 = st.columns(2)
-
-            with col1:
-                st.subheader("FTE podle osob")
-                person_fte_df = pd.DataFrame({
-                    'Osoba': person_fte.index,
-                    'FTE': person_fte.values
-                })
-                # Format FTE to 2 decimal places
-                person_fte_df['FTE'] = person_fte_df['FTE'].apply(lambda x: f"{x:.2f}")
-                st.table(person_fte_df)
-
-            with col2:
-                st.subheader("Celkový přehled")
-                st.metric("Celkem FTE všech osob", f"{person_fte.sum():.2f}")
-
-            # Visualization: FTE by person
-            fig_person = create_bar_chart(
-                person_fte.values,
-                person_fte.index,
-                'FTE podle osob',
-                'FTE',
-                [f"{x:.2f} FTE" for x in person_fte.values]
-            )
-            all_figures['03_FTE_podle_osob'] = fig_person
-            st.plotly_chart(fig_person, use_container_width=True)
-
-            # Comparison: Planned vs Actual FTE
-            st.subheader("Porovnání plánovaného a skutečného FTE")
-            planned_fte_filtered = {person: fte for person, fte in planned_fte.items()
-                                   if person in person_fte.index}
-            actual_fte = person_fte[list(planned_fte_filtered.keys())]
-
-            fig_comparison = create_comparison_chart(
-                list(planned_fte_filtered.values()),
-                actual_fte.values,
-                list(planned_fte_filtered.keys())
-            )
-            all_figures['04_Porovnani_planovane_vs_skutecne_FTE'] = fig_comparison
-            st.plotly_chart(fig_comparison, use_container_width=True)
+                col1, col2 = st.columns(2)
 
-            # OPS Analysis
-            st.header("🔧 Analýza OPS aktivit")
+                with col1:
+                    st.subheader("Tabulka projektů")
+                    render_table(project_data, key='projects')
+
+                with col2:
+                    st.subheader("Celkové FTE")
+                    total_fte = project_data.loc['CELKEM', 'FTE']
+                    st.metric("Celkem FTE", f"{total_fte:.2f}")
+
+                if len(months) > 1:
+                    st.subheader("FTE projektů podle měsíců")
+                    render_table(results['project_monthly_fte'], key='project_monthly_fte')
+
+                    st.subheader("Meziměsíční změna FTE projektů")
+                    render_table(results['project_month_over_month'], key='project_month_over_month')
+                    fig_trend = create_trend_chart(
+                        results['project_monthly_fte'].drop(columns='Celkem'),
+                        'Vývoj FTE projektů',
+                        'FTE'
+                    )
+                    all_figures['07_Vyvoj_FTE_projektu'] = fig_trend
+                    st.plotly_chart(fig_trend, use_container_width=True)
+
+                # Visualization: FTE by project
+                st.subheader("FTE a podíl času podle projektů")
+                project_data_sorted = project_data[:-1].sort_values('FTE')
+                fig_fte = create_bar_chart(
+                    project_data_sorted['FTE'],
+                    project_data_sorted.index,
+                    'FTE a podíl času podle projektů',
+                    'FTE',
+                    [f"{fte:.2f} FTE ({pct:.2f}%)" for fte, pct in
+                     zip(project_data_sorted['FTE'], project_data_sorted['Podíl (%)'])]
+                )
+                all_figures['01_FTE_podle_projektu'] = fig_fte
+                st.plotly_chart(fig_fte, use_container_width=True)
+
+                # Visualization: Hours by project
+                st.subheader("Rozdělení práce mezi projekty")
+                projects_sorted = project_data[:-1].sort_values('Celkem hodin', ascending=True)
+                fig_hours = create_bar_chart(
+                    projects_sorted['Celkem hodin'],
+                    projects_sorted.index,
+                    'Rozdělení práce mezi projekty',
+                    'Počet hodin',
+                    [f"{hours:.2f}h ({pct:.2f}%)" for hours, pct in
+                     zip(projects_sorted['Celkem hodin'], projects_sorted['Podíl (%)'])]
+                )
+                all_figures['02_Hodiny_podle_projektu'] = fig_hours
+                st.plotly_chart(fig_hours, use_container_width=True)
 
-            try:
-                ops_activities = analyzer.analyze_ops_activities()
-                ops_by_person = analyzer.analyze_ops_by_person()
+            # Person FTE Analysis
+            with span('UI: Osoby'):
+                st.header("👥 Analýza podle osob")
 
                 col1, col2 = st.columns(2)
 
                 with col1:
-                    st.subheader("OPS aktivity celkem")
-                    # Format all numeric columns to 2 decimal places
-                    ops_activities_display = ops_activities.copy()
-                    for col in ops_activities_display.columns:
-                        if ops_activities_display[col].dtype in ['float64', 'float32']:
-                            ops_activities_display[col] = ops_activities_display[col].apply(lambda x: f"{x:.2f}")
-                    st.table(ops_activities_display)
+                    st.subheader("FTE podle osob")
+                    person_fte_df = pd.DataFrame({
+                        'Osoba': person_fte.index,
+                        'FTE': person_fte.values
+                    })
+                    render_table(person_fte_df, key='person_fte', hide_index=True)
 
                 with col2:
-                    st.subheader("OPS aktivity podle osob")
-                    # Format all numeric columns to 2 decimal places
-                    ops_by_person_display = ops_by_person.copy()
-                    for col in ops_by_person_display.columns:
-                        if ops_by_person_display[col].dtype in ['float64', 'float32']:
-                            ops_by_person_display[col] = ops_by_person_display[col].apply(lambda x: f"{x:.2f}")
-                    st.table(ops_by_person_display)
-
-                # Visualization: OPS activities
-                ops_activities_order = ['Jobs', 'Reviews', 'Hiring', 'Nespárované']
-                ops_data_reordered = ops_activities.reindex(ops_activities_order)
-
-                fig_ops = create_bar_chart(
-                    ops_data_reordered['Natrackováno'][:-1],
-                    ops_data_reordered.index[:-1],
-                    'Rozdělení OPS aktivit',
-                    'Hodiny',
-                    [f"{ops_data_reordered['Natrackováno'][i]:.2f}h ({ops_data_reordered['Podíl (%)'][i]:.2f}%)"
-                     for i in ops_data_reordered.index[:-1]]
+                    st.subheader("Celkový přehled")
+                    st.metric("Celkem FTE všech osob", f"{person_fte.sum():.2f}")
+
+                if len(months) > 1:
+                    st.subheader("FTE osob podle měsíců")
+                    render_table(results['person_monthly_fte'], key='person_monthly_fte')
+
+                    st.subheader("Meziměsíční změna FTE osob")
+                    render_table(results['person_month_over_month'], key='person_month_over_month')
+
+                # Visualization: FTE by person
+                fig_person = create_bar_chart(
+                    person_fte.values,
+                    person_fte.index,
+                    'FTE podle osob',
+                    'FTE',
+                    [f"{x:.2f} FTE" for x in person_fte.values]
                 )
-                all_figures['05_OPS_aktivity_celkem'] = fig_ops
-                st.plotly_chart(fig_ops, use_container_width=True)
-
-                # Individual OPS charts per person
-                st.subheader("OPS aktivity podle jednotlivých osob")
-
-                chart_counter = 6
-                for person in ops_by_person.index:
-                    person_data = pd.Series(0.0, index=ops_activities_order)
-                    for activity in ops_activities_order:
-                        if activity in ops_by_person.columns:
-                            person_data[activity] = ops_by_person.loc[person, activity]
-
-                    fig_person_ops = create_bar_chart(
-                        person_data.values,
-                        person_data.index,
-                        f'OPS aktivity - {person}',
-                        'Hodiny',
-                        [f"{val:.2f}h" for val in person_data.values]
-                    )
-                    all_figures[f'{chart_counter:02d}_OPS_aktivity_{person.replace(" ", "_")}'] = fig_person_ops
-                    chart_counter += 1
-                    st.plotly_chart(fig_person_ops, use_container_width=True)
+                all_figures['03_FTE_podle_osob'] = fig_person
+                st.plotly_chart(fig_person, use_container_width=True)
 
-                # Detailed view of "Nespárované" category
-                st.subheader("🔍 Detail kategorie 'Nespárované'")
+            # Daily tracking check: missing days, long days and drift per person
+            with span('UI: Denní vykazování'):
+                tracking_section(analyzer, period)
 
-                ops_project = analyzer._get_ops_project()
-                ops_data = analyzer.df[analyzer.df['Projekt'] == ops_project].copy()
+            # Comparison: Planned vs Actual FTE (reruns on its own when planned values change)
+            planned_fte_section(person_fte)
 
-                def categorize_description(desc):
-                    if pd.isna(desc):
-                        return 'Nespárované'
-                    desc = str(desc).lower()
-                    for category, keywords in analyzer.categories.items():
-                        if any(keyword in desc for keyword in keywords):
-                            return category
-                    return 'Nespárované'
+            # OPS Analysis
+            with span('UI: OPS'):
+                st.header("🔧 Analýza OPS aktivit")
+                ops_activities = ops_by_person = ops_team = None
 
-                ops_data['Kategorie'] = ops_data['Popis'].apply(categorize_description)
-                ostatni_data = ops_data[ops_data['Kategorie'] == 'Nespárované'].copy()
+                try:
+                    if results['ops_error']:
+                        raise ValueError(results['ops_error'])
+
+                    # Several teams' OPS projects: breakdowns are sliced per team from one cached groupby
+                    teams = results['ops_teams']
+                    if len(teams) > 1:
+                        selected_team = st.selectbox(
+                            "Tým",
+                            [ALL_TEAMS] + teams,
+                            index=teams.index(get_default_team(teams)) + 1,
+                            key='ops_team'
+                        )
+                        ops_team = None if selected_team == ALL_TEAMS else selected_team
+                    team_label = f" – {ops_team}" if ops_team else ""
+                    ops_activities = analyzer.analyze_ops_activities(ops_team, *period)
+                    ops_by_person = analyzer.analyze_ops_by_person(ops_team, *period)
 
-                if len(ostatni_data) > 0:
-                    st.markdown(f"**Počet záznamů v kategorii 'Nespárované': {len(ostatni_data)}**")
-                    st.markdown(f"**Celkem hodin: {ostatni_data['Natrackováno'].sum():.2f}h**")
+                    col1, col2 = st.columns(2)
 
-                    # Display detailed table
-                    ostatni_display = ostatni_data[['Datum', 'Osoba', 'Natrackováno', 'Popis']].copy()
-                    ostatni_display = ostatni_display.sort_values('Datum', ascending=False)
-                    ostatni_display['Datum'] = ostatni_display['Datum'].dt.strftime('%Y-%m-%d')
-                    ostatni_display['Natrackováno'] = ostatni_display['Natrackováno'].apply(lambda x: f"{x:.2f}")
+                    with col1:
+                        st.subheader("OPS aktivity celkem")
+                        render_table(ops_activities, key='ops_activities')
 
-                    st.table(ostatni_display)
-                else:
-                    st.success("✅ Vše natrackováno správně")
+                    with col2:
+                        st.subheader("OPS aktivity podle osob")
+                        render_table(ops_by_person, key='ops_by_person')
 
-            except ValueError as e:
-                st.warning(f"⚠️ {str(e)}")
+                    # Visualization: OPS activities
+                    ops_activities_order = list(analyzer.categories) + [UNMATCHED_CATEGORY]
+                    ops_data_reordered = ops_activities.reindex(ops_activities_order)
 
-            # Export buttons
-            st.header("📥 Export dat")
+                    fig_ops = create_bar_chart(
+                        ops_data_reordered['Natrackováno'][:-1],
+                        ops_data_reordered.index[:-1],
+                        f'Rozdělení OPS aktivit{team_label}',
+                        'Hodiny',
+                        [f"{ops_data_reordered['Natrackováno'][i]:.2f}h ({ops_data_reordered['Podíl (%)'][i]:.2f}%)"
+                         for i in ops_data_reordered.index[:-1]]
+                    )
+                    all_figures['05_OPS_aktivity_celkem'] = fig_ops
+                    st.plotly_chart(fig_ops, use_container_width=True)
+
+                    # OPS charts per person, all people in a single figure
+                    st.subheader("OPS aktivity podle jednotlivých osob")
+
+                    person_ops = ops_by_person.reindex(columns=ops_activities_order, fill_value=0.0)
+                    person_ops_view = st.radio(
+                        "Zobrazení",
+                        ["Všechny osoby", "Výběr osoby"],
+                        horizontal=True,
+                        key='ops_person_view'
+                    )
+                    fig_person_ops = create_small_multiples_chart(
+                        person_ops, f'OPS aktivity podle osob{team_label}', 'Hodiny'
+                    )
+                    all_figures['06_OPS_aktivity_podle_osob'] = fig_person_ops
+                    if person_ops_view == "Výběr osoby":
+                        fig_person_ops = create_dropdown_bar_chart(person_ops, f'OPS aktivity{team_label}', 'Hodiny')
+                    st.plotly_chart(fig_person_ops, use_container_width=True)
 
-            col1, col2 = st.columns(2)
+                    # Detailed view of "Nespárované" category
+                    st.subheader("🔍 Detail kategorie 'Nespárované'")
 
-            with col1:
-                try:
-                    excel_data = export_to_excel(analyzer, person_fte, ops_activities, ops_by_person)
-                    st.download_button(
-                        label="📥 Stáhnout Excel report",
-                        data=excel_data,
-                        file_name=f"timesheet_analysis_{datetime.now().strftime('%Y%m%d')}.xlsx",
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    )
-                except:
-                    st.error("Nepodařilo se vytvořit Excel export")
+                    ostatni_data = analyzer.get_ops_data(UNMATCHED_CATEGORY, ops_team, *period)
 
-            with col2:
-                try:
-                    if all_figures:
-                        zip_data = export_all_charts_as_zip(all_figures)
-                        st.download_button(
-                            label="📊 Stáhnout všechny grafy (ZIP)",
-                            data=zip_data,
-                            file_name=f"timesheet_charts_{datetime.now().strftime('%Y%m%d')}.zip",
-                            mime="application/zip"
+                    if len(ostatni_data) > 0:
+                        st.markdown(f"**Počet záznamů v kategorii 'Nespárované': {len(ostatni_data)}**")
+                        st.markdown(f"**Celkem hodin: {ostatni_data['Natrackováno'].sum():.2f}h**")
+
+                        # Display detailed table (paged for large datasets)
+                        render_table(
+                            ostatni_data[['Datum', 'Osoba', 'Natrackováno', 'Popis']],
+                            key='unmatched',
+                            default_sort=('Datum', False),
+                            hide_index=True
                         )
-                except Exception as e:
-                    st.warning("⚠️ Export grafů není dostupný na Streamlit Cloud")
-                    st.info("💡 Pro export grafů spusťte aplikaci lokálně nebo použijte screenshot")
+
+                        # Categories proposed by similarity to the descriptions the keywords matched
+                        st.subheader("🤖 Návrhy kategorií")
+                        suggestions = analyzer.suggest_categories(ops_team, *period)
+                        suggestions = suggestions[suggestions['Navržená kategorie'].notna()]
+                        if len(suggestions) > 0:
+                            st.markdown(
+                                f"**Návrh pro {len(suggestions)} popisů "
+                                f"({suggestions['Celkem hodin'].sum():.2f}h)**, "
+                                "klíčová slova kategorií lze podle nich doplnit"
+                            )
+                            render_table(suggestions, key='suggestions')
+                        else:
+                            st.info("Pro nespárované popisy není žádný dostatečně podobný návrh")
+                    else:
+                        st.success("✅ Vše natrackováno správně")
+
+                except ValueError as e:
+                    st.warning(f"⚠️ {str(e)}")
+
+            # Export buttons
+            with span('UI: Export'):
+                export_section(
+                    (data_key, ops_team) + period,
+                    analyzer, person_fte, ops_activities, ops_by_person, all_figures, period
+                )
 
         except Exception as e:
             st.error(f"❌ Chyba při zpracování souboru: {str(e)}")
             st.info("💡 Zkontrolujte, zda soubor obsahuje správné sloupce: Datum, Projekt, Osoba, Natrackováno, Popis")
 
     else:
-        st.info("👆 Nahrajte Excel soubor v postranním panelu pro začátek analýzy")
+        if watcher is not None:
+            st.info(f"📂 Ve složce {watcher.folder} zatím nejsou načtené žádné exporty, můžete je také nahrát")
+        else:
+            st.info("👆 Nahrajte Excel soubor v postranním panelu pro začátek analýzy")
 
         # Show example format
         st.markdown("### 📋 Očekávaný formát dat")
@@ -0,0 +1,69 @@
+"""Write time and peak memory of the report exports.
+
+Compares the previous in-memory ``pd.ExcelWriter`` path with the streaming
+``export_to_excel`` and the CSV/Parquet bundles, all including the source rows.
+Peak memory is measured with tracemalloc in a separate run, so it does not
+slow down the timed one.
+
+    python benchmarks/bench_export.py --rows 100000
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import generate_timesheet  # noqa: E402
+from timesheet import REQUIRED_COLUMNS, TimesheetAnalyzer, normalize_timesheet  # noqa: E402
+from timesheet.export import export_bundle, export_to_excel, get_report_tables  # noqa: E402
+
+
+def export_with_pandas(analyzer, *tables_args):
+    """The former export: every sheet built in memory by pd.ExcelWriter"""
+    output = BytesIO()
+    with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        for sheet_name, (df, index) in get_report_tables(analyzer, *tables_args, include_monthly=True).items():
+            df.to_excel(writer, sheet_name=sheet_name, index=index)
+        for month, rows in analyzer.df[REQUIRED_COLUMNS].groupby(analyzer.df['Měsíc']):
+            rows.to_excel(writer, sheet_name=f"Data {month}", index=False)
+    return output
+
+
+def measure(label, func):
+    start = time.perf_counter()
+    size = len(func().getvalue())
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"{label:<28} {seconds:8.2f} s {peak / 2**20:9.1f} MB peak {size / 2**20:8.1f} MB file")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--months', type=int, default=12)
+    args = parser.parse_args()
+
+    analyzer = TimesheetAnalyzer()
+    analyzer.load_data(normalize_timesheet(generate_timesheet(rows=args.rows, people=40, months=args.months)))
+    tables_args = (analyzer.get_person_fte(), analyzer.analyze_ops_activities(), analyzer.analyze_ops_by_person())
+    print(f"{args.rows} rows, {args.months} months")
+
+    measure('pd.ExcelWriter (openpyxl)', lambda: export_with_pandas(analyzer, *tables_args))
+    measure('export_to_excel (streaming)', lambda: export_to_excel(
+        analyzer, *tables_args, include_raw=True, include_monthly=True))
+    for file_format in ('csv', 'parquet'):
+        measure(f'export_bundle ({file_format})', lambda: export_bundle(
+            analyzer, *tables_args, file_format=file_format, include_raw=True, include_monthly=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""Load-time benchmark of the timesheet readers.
+
+Writes a synthetic Costlocker-shaped export (with extra unused columns) and
+compares the original full ``pd.read_excel`` with ``read_timesheet`` for every
+available Excel engine and for CSV.
+
+    python benchmarks/bench_load.py --rows 100000
+"""
+import argparse
+import importlib.util
+import sys
+import tempfile
+import time
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import timesheet.readers as readers  # noqa: E402
+from benchmarks.synthetic import generate_timesheet  # noqa: E402
+
+
+def timed(label, func, repeat):
+    best = min(_run_once(func) for _ in range(repeat))
+    print(f"{label:<40} {best:8.2f} s")
+
+
+def _run_once(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        xlsx_path = Path(tmp) / 'export.xlsx'
+        csv_path = Path(tmp) / 'export.csv'
+        export = generate_timesheet(rows=args.rows, people=30, months=12)
+        export.to_excel(xlsx_path, index=False)
+        export.to_csv(csv_path, index=False)
+        print(f"{args.rows} rows, xlsx {xlsx_path.stat().st_size / 1e6:.1f} MB")
+
+        timed('pd.read_excel (all columns, openpyxl)',
+              lambda: pd.read_excel(xlsx_path, engine='openpyxl'), args.repeat)
+        with mock.patch.object(readers, 'get_excel_engine', return_value='openpyxl'):
+            timed('read_timesheet xlsx (openpyxl streaming)',
+                  lambda: readers.read_timesheet(xlsx_path, 'xlsx'), args.repeat)
+        if importlib.util.find_spec('python_calamine'):
+            timed('read_timesheet xlsx (calamine)',
+                  lambda: readers.read_timesheet(xlsx_path, 'xlsx'), args.repeat)
+        else:
+            print("python-calamine not installed, skipping calamine engine")
+        timed('read_timesheet csv',
+              lambda: readers.read_timesheet(csv_path, 'csv'), args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""Cold start of the app: import times in fresh interpreters and the holiday calendar build.
+
+Every import is timed in a new Python process (median of --repeat runs), with
+Streamlit already imported as it is by ``streamlit run`` before the script.
+``app (eager imports)`` imports what app.py used to import at module level,
+for comparison with the lazily importing ``app``.
+
+    python benchmarks/bench_startup.py --repeat 5
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+IMPORTS = {
+    'streamlit': ('', 'import streamlit'),
+    'timesheet': ('import streamlit', 'import timesheet'),
+    'timesheet.analyzer': ('import streamlit', 'import timesheet.analyzer'),
+    'app': ('import streamlit', 'import app'),
+    'app (eager imports)': (
+        'import streamlit',
+        'import pandas, timesheet.analyzer, timesheet.charts, timesheet.export, timesheet.sqlstore, '
+        'timesheet.store, timesheet.watcher, ui_tables',
+    ),
+}
+
+
+def time_import(setup, statement):
+    """Seconds the statement takes in a fresh interpreter after setup"""
+    code = (
+        f"import sys, time; sys.path.insert(0, {str(ROOT)!r}); {setup}\n"
+        f"start = time.perf_counter(); {statement}; print(time.perf_counter() - start)"
+    )
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, cwd=ROOT)
+    return float(result.stdout.split()[-1])
+
+
+def time_calendars(years):
+    """Seconds of the first WorkingCalendar of the process and of another one for the same years"""
+    from timesheet import WorkingCalendar
+
+    timings = []
+    for _ in range(2):
+        start = time.perf_counter()
+        WorkingCalendar(*years)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    for label, (setup, statement) in IMPORTS.items():
+        seconds = statistics.median(time_import(setup, statement) for _ in range(args.repeat))
+        print(f"import {label:<24} {seconds * 1000:8.0f} ms")
+
+    first, repeated = time_calendars((2019, 2026))
+    print(f"{'WorkingCalendar 2019–2026 (first)':<31} {first * 1000:8.1f} ms")
+    print(f"{'WorkingCalendar 2019–2026 (again)':<31} {repeated * 1000:8.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""Benchmarks of the TimesheetAnalyzer hot paths on synthetic data.
+
+    python benchmarks/run.py --sizes 10000 100000 1000000
+    python benchmarks/run.py --json baseline.json
+    python benchmarks/run.py --compare baseline.json --threshold 1.25
+
+Every benchmark starts from a freshly loaded analyzer, so memoized results
+from a previous benchmark are never measured. With --compare the run exits
+with status 1 when any benchmark is slower than the baseline by more than
+the threshold factor.
+"""
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import generate_timesheet  # noqa: E402
+from timesheet import SqlTimesheetStore, TimesheetAnalyzer, export_to_excel, normalize_timesheet  # noqa: E402
+
+
+def fresh_analyzer(df):
+    analyzer = TimesheetAnalyzer()
+    analyzer.load_data(df.copy())
+    return analyzer
+
+
+def bench_load_data(df):
+    raw = df.copy()
+    start = time.perf_counter()
+    analyzer = TimesheetAnalyzer()
+    analyzer.load_data(normalize_timesheet(raw))
+    return time.perf_counter() - start
+
+
+def bench_method(name):
+    def bench(df):
+        method = getattr(fresh_analyzer(df), name)
+        start = time.perf_counter()
+        method()
+        return time.perf_counter() - start
+    bench.__name__ = f"bench_{name}"
+    return bench
+
+
+def bench_period_switch(df):
+    """Project, person and OPS tables of every single month, sliced from an already built cube"""
+    analyzer = fresh_analyzer(df)
+    analyzer.get_cube()
+    months = [str(month) for month in analyzer.get_months()]
+    start = time.perf_counter()
+    for month in months:
+        analyzer.analyze_by_project(month, month)
+        analyzer.get_person_fte(month, month)
+        analyzer.analyze_ops_by_person(None, month, month)
+    return (time.perf_counter() - start) / len(months)
+
+
+def bench_sql_store(df):
+    """Project, person and OPS tables aggregated in a SQLite store (filled beforehand, not measured)"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = SqlTimesheetStore(Path(directory) / 'timesheet.sqlite')
+        store.append(df)
+        start = time.perf_counter()
+        analyzer = TimesheetAnalyzer()
+        analyzer.load_from_sql(store)
+        analyzer.analyze_by_project()
+        analyzer.get_person_fte()
+        analyzer.analyze_ops_by_person()
+        return time.perf_counter() - start
+
+
+def bench_export_to_excel(df):
+    analyzer = fresh_analyzer(df)
+    start = time.perf_counter()
+    export_to_excel(
+        analyzer,
+        analyzer.get_person_fte(),
+        analyzer.analyze_ops_activities(),
+        analyzer.analyze_ops_by_person()
+    )
+    return time.perf_counter() - start
+
+
+def bench_charts(df):
+    from timesheet.charts import create_bar_chart, create_small_multiples_chart
+
+    analyzer = fresh_analyzer(df)
+    project_data, _, _ = analyzer.analyze_by_project()
+    person_fte = analyzer.get_person_fte()
+    ops_by_person = analyzer.analyze_ops_by_person()
+    categories = [col for col in ops_by_person.columns if col not in ('Celkem', 'Podíl (%)')]
+
+    start = time.perf_counter()
+    create_bar_chart(project_data['FTE'][:-1], project_data.index[:-1], 'FTE', 'FTE',
+                     [f"{x:.2f}" for x in project_data['FTE'][:-1]])
+    create_bar_chart(person_fte.values, person_fte.index, 'FTE podle osob', 'FTE',
+                     [f"{x:.2f}" for x in person_fte.values])
+    create_small_multiples_chart(ops_by_person[categories], 'OPS aktivity podle osob', 'Hodiny')
+    return time.perf_counter() - start
+
+
+BENCHMARKS = {
+    'load_data': bench_load_data,
+    'analyze_by_project': bench_method('analyze_by_project'),
+    'analyze_ops_activities': bench_method('analyze_ops_activities'),
+    'analyze_ops_by_person': bench_method('analyze_ops_by_person'),
+    'get_person_fte': bench_method('get_person_fte'),
+    'get_cube': bench_method('get_cube'),
+    'analyze_month_over_month': bench_method('analyze_month_over_month'),
+    'period_switch': bench_period_switch,
+    'detect_tracking_anomalies': bench_method('detect_tracking_anomalies'),
+    'sql_store': bench_sql_store,
+    'export_to_excel': bench_export_to_excel,
+    'charts': bench_charts,
+}
+
+
+def run(sizes, names, repeat, people, months):
+    results = {}
+    for rows in sizes:
+        df = normalize_timesheet(generate_timesheet(rows=rows, people=people, months=months))
+        for name in names:
+            best = min(BENCHMARKS[name](df) for _ in range(repeat))
+            results[f"{name}[{rows}]"] = best
+            print(f"{name:<24} {rows:>9} rows {best * 1000:10.1f} ms", flush=True)
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for key, seconds in results.items():
+        if key in baseline and seconds > baseline[key] * threshold:
+            regressions.append(f"{key}: {baseline[key] * 1000:.1f} ms -> {seconds * 1000:.1f} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--only', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--people', type=int, default=40)
+    parser.add_argument('--months', type=int, default=12)
+    parser.add_argument('--json', help="Write results (seconds) to this file")
+    parser.add_argument('--compare', help="Baseline JSON written by an earlier --json run")
+    parser.add_argument('--threshold', type=float, default=1.25)
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.only, args.repeat, args.people, args.months)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    if args.compare:
+        regressions = compare(results, json.loads(Path(args.compare).read_text()), args.threshold)
+        if regressions:
+            print("\nRegressions:\n" + "\n".join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
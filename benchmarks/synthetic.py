@@ -0,0 +1,78 @@
+"""Synthetic Costlocker-shaped timesheet exports for benchmarks.
+
+    from benchmarks.synthetic import generate_timesheet
+    df = generate_timesheet(rows=100_000, people=40, months=12)
+"""
+import numpy as np
+import pandas as pd
+
+from timesheet.working_calendar import WorkingCalendar
+
+FIRST_NAMES = ['Jan', 'Petr', 'Jana', 'Tomáš', 'Eva', 'Karel', 'Lucie', 'Martin', 'Tereza', 'Jakub']
+LAST_NAMES = ['Novák', 'Svoboda', 'Dvořák', 'Černá', 'Procházka', 'Kučera', 'Veselá', 'Horák', 'Němcová', 'Marek']
+
+# OPS descriptions by the category they should fall into (None = unmatched)
+OPS_VOCABULARY = {
+    'Jobs': ['Jobs', 'job posting', 'Jobs - úprava inzerátu', 'job description'],
+    'Reviews': ['Design review', 'review PR', 'Portfolio review', 'review návrhů'],
+    'Hiring': ['hiring call', 'Interview s kandidátem', 'hiring sync', 'technical interview'],
+    None: ['Porada týmu', 'Sync', '1:1', 'Plánování sprintu', 'Onboarding', 'Administrativa']
+}
+
+PROJECT_DESCRIPTIONS = ['Návrh obrazovek', 'Konzultace', 'Prototyp', 'Úpravy dle zpětné vazby', 'Workshop']
+
+HOURS = np.array([0.25, 0.5, 1.0, 1.5, 2.0, 3.0, 4.0, 6.0, 8.0])
+
+
+def generate_timesheet(rows=10_000, people=15, projects=8, months=1, start='2025-01',
+                       ops_share=0.3, unmatched_share=0.3, description_variants=50,
+                       ops_vocabulary=None, seed=0):
+    """Random export with the columns (and some unused extras) of a Costlocker export.
+
+    ops_share of rows belongs to the OPS project; of those, unmatched_share uses
+    descriptions that no category matches. Every vocabulary entry comes in
+    description_variants distinct spellings, which controls how many unique
+    descriptions the categorizer sees.
+    """
+    rng = np.random.default_rng(seed)
+    ops_vocabulary = ops_vocabulary or OPS_VOCABULARY
+
+    first_month = pd.Period(start, freq='M')
+    last_month = first_month + months - 1
+    calendar = WorkingCalendar(first_month.year, last_month.year)
+    days = pd.bdate_range(
+        first_month.start_time, last_month.end_time.normalize(), freq='C', holidays=calendar.holidays
+    )
+
+    name_count = len(FIRST_NAMES) * len(LAST_NAMES)
+    people_names = np.array([
+        f"{FIRST_NAMES[i % len(FIRST_NAMES)]} {LAST_NAMES[i // len(FIRST_NAMES) % len(LAST_NAMES)]}"
+        + (f" {i // name_count + 1}" if i >= name_count else '')
+        for i in range(people)
+    ])
+    ops_project = f"Design tým OPS_{first_month.year}"
+    other_projects = np.array([f"Projekt {chr(ord('A') + i % 26)}{i // 26 or ''}" for i in range(max(projects - 1, 1))])
+
+    is_ops = rng.random(rows) < ops_share
+    project = np.where(is_ops, ops_project, rng.choice(other_projects, rows))
+
+    matched = [text for category, texts in ops_vocabulary.items() if category is not None for text in texts]
+    unmatched = ops_vocabulary.get(None, ['Ostatní'])
+    is_unmatched = rng.random(rows) < unmatched_share
+    ops_text = np.where(is_unmatched, rng.choice(unmatched, rows), rng.choice(matched, rows))
+    text = np.where(is_ops, ops_text, rng.choice(PROJECT_DESCRIPTIONS, rows))
+
+    variant = rng.integers(0, description_variants, rows)
+    description = pd.Series(text, dtype=object) + np.where(variant > 0, ' #' + variant.astype(str), '')
+    description[rng.random(rows) < 0.02] = None
+
+    return pd.DataFrame({
+        'Datum': rng.choice(days, rows),
+        'Klient': rng.choice(['Interní', 'Klient A', 'Klient B'], rows),
+        'Projekt': project,
+        'Aktivita': rng.choice(['Design', 'Konzultace', 'Správa'], rows),
+        'Osoba': rng.choice(people_names, rows),
+        'Natrackováno': rng.choice(HOURS, rows),
+        'Popis': description,
+        'Fakturovatelné': rng.choice(['Ano', 'Ne'], rows)
+    })
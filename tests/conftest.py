@@ -0,0 +1,22 @@
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.synthetic import generate_timesheet  # noqa: E402
+from timesheet import normalize_timesheet  # noqa: E402
+
+
+@pytest.fixture
+def export():
+    """A small normalized two-month export with an OPS project"""
+    return normalize_timesheet(generate_timesheet(rows=300, people=5, months=2))
+
+
+def with_rows(df, **values):
+    """df with one more row, a copy of its first row with the given column values"""
+    row = df.iloc[:1].assign(**values)
+    return pd.concat([df, row], ignore_index=True)
@@ -0,0 +1,82 @@
+import pandas as pd
+import pytest
+
+from timesheet import TimesheetAnalyzer
+from timesheet.analyzer import PERIOD_RESULTS_ENTRIES
+
+from conftest import with_rows
+
+
+def load(df):
+    analyzer = TimesheetAnalyzer()
+    analyzer.load_data(df)
+    return analyzer
+
+
+def test_rows_without_date_or_person_are_left_out(export):
+    expected = load(export.copy())
+    analyzer = load(with_rows(with_rows(export, Datum=pd.NaT), Osoba=None))
+
+    pd.testing.assert_frame_equal(analyzer.analyze_by_project()[0], expected.analyze_by_project()[0])
+    # Osoba is no longer categorical once the extra row is concatenated
+    pd.testing.assert_series_equal(analyzer.get_person_fte(), expected.get_person_fte(),
+                                  check_index_type=False, check_categorical=False)
+    pd.testing.assert_frame_equal(analyzer.analyze_ops_activities(), expected.analyze_ops_activities())
+
+
+def test_daily_tracking_ignores_rows_without_person(export):
+    expected = load(export.copy())
+    analyzer = load(with_rows(export, Osoba=None))
+
+    summary, events = analyzer.detect_tracking_anomalies()
+    expected_summary, expected_events = expected.detect_tracking_anomalies()
+    pd.testing.assert_frame_equal(summary, expected_summary)
+    pd.testing.assert_frame_equal(events, expected_events)
+
+
+def test_daily_tracking_counts_days_since_last_entry(export):
+    person = export['Osoba'].iloc[0]
+    last_month = export['Datum'].dt.to_period('M').max()
+    stopped = export[(export['Osoba'] != person) | (export['Datum'].dt.to_period('M') < last_month)]
+    analyzer = load(stopped.reset_index(drop=True))
+
+    summary, _ = analyzer.detect_tracking_anomalies()
+    days = analyzer.get_daily_hours().columns
+    last_entry = stopped.loc[stopped['Osoba'] == person, 'Datum'].max()
+    assert summary.loc[person, 'Dny od posledního záznamu'] == (days > last_entry).sum() > 0
+
+
+@pytest.mark.parametrize('project, team', [
+    ('Design tým OPS_2025', 'Design tým'),
+    ('DesignOps 2025', 'Design'),
+    ('DesignOPS_2024', 'Design'),
+    ('Design Ops', 'Design'),
+    ('OPS - Design', 'OPS - Design'),
+])
+def test_ops_project_names(export, project, team):
+    export['Projekt'] = export['Projekt'].astype(str).replace('Design tým OPS_2025', project)
+    analyzer = load(export)
+
+    assert analyzer.get_ops_projects().to_dict() == {project: team}
+    assert analyzer.analyze_ops_activities()['Natrackováno'].sum() > 0
+
+
+@pytest.mark.parametrize('project', ['DevOps 2025', 'Workshops', 'WORKSHOPS 2025', 'LAPTOPS', 'TOPS', 'Shop redesign'])
+def test_projects_that_are_not_ops(export, project):
+    export['Projekt'] = export['Projekt'].astype(str).replace('Design tým OPS_2025', project)
+
+    with pytest.raises(ValueError):
+        load(export).get_ops_projects()
+
+
+def test_period_results_are_bounded(export):
+    analyzer = load(export)
+    month = str(analyzer.get_months()[0])
+    project_data = analyzer.analyze_by_project(month, month)
+
+    for window in range(1, PERIOD_RESULTS_ENTRIES + 1):
+        analyzer.detect_tracking_anomalies(month, month, window)
+    assert len(analyzer._period_results) == PERIOD_RESULTS_ENTRIES
+    # Evicted results are computed again, base frames like the cube stay cached
+    assert analyzer.analyze_by_project(month, month) is not project_data
+    assert ('get_cube', (), ()) in analyzer._derived
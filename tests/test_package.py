@@ -0,0 +1,18 @@
+import pkgutil
+import subprocess
+import sys
+from pathlib import Path
+
+import timesheet
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_core_imports_without_streamlit():
+    modules = [
+        f'timesheet.{module.name}' for module in pkgutil.iter_modules(timesheet.__path__)
+        if module.name != '__main__'
+    ]
+    # A None entry in sys.modules makes importing streamlit fail
+    code = f"import sys; sys.modules['streamlit'] = None; import {', '.join(modules)}"
+    subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
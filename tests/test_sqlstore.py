@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+
+from timesheet import SqlTimesheetStore, TimesheetAnalyzer
+
+
+def test_sql_analyses_match_frame_with_missing_hours(tmp_path, export):
+    export.loc[export.index[::30], 'Natrackováno'] = np.nan
+    expected = TimesheetAnalyzer()
+    expected.load_data(export.copy())
+
+    store = SqlTimesheetStore(tmp_path / 'history.sqlite')
+    store.append(export)
+    analyzer = TimesheetAnalyzer()
+    analyzer.load_from_sql(store)
+
+    pd.testing.assert_frame_equal(
+        analyzer.analyze_by_project()[0], expected.analyze_by_project()[0], check_index_type=False
+    )
+    assert analyzer.get_cube()['Počet záznamů'].sum() == export['Natrackováno'].count()
+    for result, frame_result in zip(analyzer.detect_tracking_anomalies(), expected.detect_tracking_anomalies()):
+        pd.testing.assert_frame_equal(result, frame_result, check_index_type=False, check_categorical=False)
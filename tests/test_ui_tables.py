@@ -0,0 +1,14 @@
+import pandas as pd
+
+from ui_tables import table_view
+
+
+def test_table_view_filters_and_sorts_by_index():
+    df = pd.DataFrame(
+        {'Natrackováno': [5.0, 3.0, 8.0]},
+        index=pd.Index(['Jan Novák', 'Eva Dvořáková', 'Petr Novák'], name='Osoba')
+    )
+
+    view = table_view(df, 'novák', 'Osoba', False)
+    pd.testing.assert_frame_equal(view, df.iloc[[2, 0]])
+    assert list(table_view(df, '', 'Natrackováno', True).index) == ['Eva Dvořáková', 'Jan Novák', 'Petr Novák']
@@ -0,0 +1,44 @@
+import os
+import shutil
+
+from timesheet import FolderWatcher
+
+
+class FailingStore:
+    """Store whose first append fails, as a locked database does"""
+
+    def __init__(self):
+        self.appended = []
+
+    def append(self, df):
+        self.appended.append(df)
+        if len(self.appended) == 1:
+            raise OSError('database is locked')
+
+
+def test_failed_ingest_is_retried(tmp_path, export):
+    export.to_csv(tmp_path / 'leden.csv', index=False)
+    os.utime(tmp_path / 'leden.csv', (0, 0))
+    store = FailingStore()
+    watcher = FolderWatcher(tmp_path, interval=1, store=store)
+
+    assert not watcher.poll()
+    assert watcher.error == 'database is locked'
+    assert watcher.current() == (None, None)
+
+    assert watcher.poll()
+    assert len(store.appended) == 2
+    data_key, analyzer = watcher.current()
+    assert analyzer is not None and watcher.error is None
+    assert watcher.files == ['leden.csv']
+
+
+def test_removed_export_is_unpublished(tmp_path, export):
+    export.to_csv(tmp_path / 'leden.csv', index=False)
+    os.utime(tmp_path / 'leden.csv', (0, 0))
+    watcher = FolderWatcher(tmp_path, interval=1)
+    assert watcher.poll()
+
+    shutil.move(tmp_path / 'leden.csv', tmp_path / 'leden.txt')
+    assert watcher.poll()
+    assert watcher.current() == (None, None)
@@ -0,0 +1,49 @@
+"""Timesheet analysis core.
+
+Importable without Streamlit or Plotly, so reports can be generated headless
+(see ``python -m timesheet``). Chart builders live in ``timesheet.charts``.
+
+Names are imported from their submodules on first access, so importing the
+package (or a light submodule such as ``timesheet.profiling``) does not load
+pandas, numpy or the holiday tables until a feature needs them.
+"""
+import importlib
+
+# Submodule defining each exported name
+_EXPORTS = {
+    'CategorySuggester': 'suggestions',
+    'FolderWatcher': 'watcher',
+    'HOURS_PER_WORKING_DAY': 'working_calendar',
+    'OpsCategorizer': 'categorizer',
+    'REQUIRED_COLUMNS': 'readers',
+    'SqlTimesheetStore': 'sqlstore',
+    'TIMESHEET_READERS': 'readers',
+    'TimesheetAnalyzer': 'analyzer',
+    'TimesheetStore': 'store',
+    'UNMATCHED_CATEGORY': 'categorizer',
+    'WorkingCalendar': 'working_calendar',
+    'compact_timesheet': 'readers',
+    'export_all_charts_as_zip': 'export',
+    'export_bundle': 'export',
+    'export_to_excel': 'export',
+    'find_exports': 'readers',
+    'get_file_hash': 'readers',
+    'memory_footprint': 'readers',
+    'merge_timesheets': 'readers',
+    'normalize_timesheet': 'readers',
+    'read_timesheet': 'readers',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{_EXPORTS[name]}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
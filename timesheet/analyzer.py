@@ -0,0 +1,492 @@
+from collections import OrderedDict
+import functools
+import inspect
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .anomalies import daily_hours_matrix, detect_tracking_anomalies
+from .categorizer import UNMATCHED_CATEGORY, OpsCategorizer
+from .profiling import traced
+from .readers import REQUIRED_COLUMNS, compact_timesheet, memory_footprint
+from .suggestions import CategorySuggester
+from .working_calendar import WorkingCalendar
+
+
+# OPS projects of all teams, e.g. "Design tým OPS_2025" (team "Design tým") or
+# "DesignOps 2025" (team "Design"); matched case-insensitively except the glued
+# Ops/OPS suffix after a lowercase letter (so "Workshops" and "WORKSHOPS" are
+# not one), DevOps projects are left out.
+# The optional named group team names the team
+OPS_PROJECT_PATTERN = r'^(?P<team>.*?)(?:[\s_-]*(?<![a-z])ops|(?-i:(?<=[a-z]))(?<!dev)(?-i:Ops|OPS))(?![a-z])'
+
+# Results of analyses taking a period kept per analyzer, least recently used
+# first out; every period and team shown adds one per analysis
+PERIOD_RESULTS_ENTRIES = 64
+
+
+def memoized(method):
+    """Cache an analyzer method result until the data or categories change.
+
+    Results of methods taking a period (start, end) are kept only for the last
+    PERIOD_RESULTS_ENTRIES calls, the base frames they are sliced from stay.
+    Only actual computations (cache misses) are recorded as profiling spans.
+    """
+    compute = traced()(method)
+    per_period = 'start' in inspect.signature(method).parameters
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        return self._get_derived(key, lambda: compute(self, *args, **kwargs), per_period)
+    return wrapper
+
+
+class TimesheetAnalyzer:
+    def __init__(self):
+        self.df = None
+        # (SqlTimesheetStore, start, end) when loaded with load_from_sql instead of a frame
+        self.sql_source = None
+        self.calendar = None
+        self.categories = {
+            'Jobs': ['jobs', 'job'],
+            'Reviews': ['review'],
+            'Hiring': ['hiring', 'interview']
+        }
+        self.ops_project_pattern = OPS_PROJECT_PATTERN
+        # Derived frames shared by all analyses and per-period results, see _get_derived
+        self._derived = {}
+        self._period_results = OrderedDict()
+        self._derived_categories_key = None
+        self._derived_lock = threading.Lock()
+        # (bytes before, bytes after) of the last load_data(compact=True)
+        self.memory_footprint = None
+
+    @traced()
+    def load_data(self, df, compact=False):
+        """Use df for all analyses, compact=True first shrinks it with compact_timesheet"""
+        if compact:
+            before = memory_footprint(df)
+            df = compact_timesheet(df)
+        self.df = df
+        self.sql_source = None
+        self.df['Datum'] = pd.to_datetime(self.df['Datum'])
+        self.df['Měsíc'] = self.df['Datum'].dt.to_period('M')
+        self._clear_derived()
+        if len(self.df):
+            self._ensure_calendar(self.df['Datum'].min().year, self.df['Datum'].max().year)
+        self.memory_footprint = (before, memory_footprint(self.df)) if compact else None
+
+    def _ensure_calendar(self, start_year, end_year):
+        if self.calendar is None or not self.calendar.covers(start_year, end_year):
+            if self.calendar is not None:
+                start_year = min(start_year, self.calendar.start_year)
+                end_year = max(end_year, self.calendar.end_year)
+            self.calendar = WorkingCalendar(start_year, end_year)
+        return self.calendar
+
+    def get_working_hours_for_month(self, year, month):
+        return self._ensure_calendar(year, year).working_hours_for_month(year, month)
+
+    def calculate_fte(self, hours, date):
+        monthly_hours = self.get_working_hours_for_month(date.year, date.month)
+        return round(hours / monthly_hours, 2)
+
+    @traced()
+    def load_from_sql(self, store, start=None, end=None):
+        """Analyze the rows of an SqlTimesheetStore between start and end months without loading them.
+
+        The cube is aggregated by the store's engine; only OPS rows (for their
+        details and category suggestions) and explicitly requested rows
+        (get_rows) are read into pandas.
+        """
+        self.df = None
+        self.sql_source = (store, start, end)
+        self._clear_derived()
+        self.memory_footprint = None
+
+    def get_months(self, start=None, end=None):
+        """All months covered by the data, optionally limited to start..end"""
+        if start is None or end is None:
+            if self.sql_source is not None:
+                data_months = self.get_cube().index.get_level_values('Měsíc')
+            else:
+                data_months = self.df['Měsíc']
+        start = pd.Period(start, freq='M') if start is not None else data_months.min()
+        end = pd.Period(end, freq='M') if end is not None else data_months.max()
+        return pd.period_range(start, end, freq='M')
+
+    def _sql_range(self, start=None, end=None):
+        """start..end months as strings, limited to the months of the SQL source"""
+        data_months = self.get_months()
+        months = self.get_months(start, end)
+        return str(max(months[0], data_months[0])), str(min(months[-1], data_months[-1]))
+
+    def get_rows(self, start=None, end=None):
+        """Source rows (with Měsíc) between start and end months, read from the store in SQL mode"""
+        if self.sql_source is not None:
+            rows = self.sql_source[0].load(*self._sql_range(start, end))
+            return rows.assign(Měsíc=rows['Datum'].dt.to_period('M'))
+        if start is None and end is None:
+            return self.df
+        return self.df[self.df['Měsíc'].isin(self.get_months(start, end))]
+
+    def get_working_hours_for_months(self, months):
+        self._ensure_calendar(months.min().year, months.max().year)
+        return pd.Series(self.calendar.working_hours_for_periods(months), index=months)
+
+    @memoized
+    def get_cube(self):
+        """Hours, records and FTE per (Měsíc, Projekt, Osoba, Kategorie) in a single groupby pass.
+
+        Kategorie is set for OPS rows only. The tables below are rolled up from
+        this cube instead of the raw rows, so changing the period, team or
+        drilling down only slices a frame of (at most) months × projects ×
+        people × categories rows.
+        """
+        try:
+            ops_projects = list(self.get_ops_projects().index)
+        except ValueError:
+            ops_projects = []  # No OPS project, no row has a category
+
+        if self.sql_source is not None:
+            # Rows already summed up (and OPS rows categorized) by the engine
+            store, start, end = self.sql_source
+            rows = store.aggregate(start, end, ops_projects, self.categories)
+            ops_mask = rows['Kategorie'].notna().to_numpy()
+            ops_categories = rows['Kategorie'][ops_mask]
+        else:
+            rows = self.df
+            ops_mask = self.get_ops_mask() if ops_projects else np.zeros(len(rows), dtype=bool)
+            ops_categories = self.get_ops_categories() if ops_projects else []
+
+        category_names = sorted(set(self.categories) | {UNMATCHED_CATEGORY})
+        codes = np.full(len(rows), -1, dtype=np.int16)
+        codes[ops_mask] = pd.Categorical(ops_categories, categories=category_names).codes
+        categories = pd.Series(
+            pd.Categorical.from_codes(codes, categories=category_names), index=rows.index, name='Kategorie'
+        )
+
+        # dropna=False keeps the NaN Kategorie of non-OPS rows, so rows without
+        # a month, project or person are left out explicitly
+        complete = (rows['Měsíc'].notna() & rows['Projekt'].notna() & rows['Osoba'].notna()).to_numpy()
+        if not complete.all():
+            rows, categories = rows[complete], categories[complete]
+        grouped = rows.groupby(['Měsíc', 'Projekt', 'Osoba', categories], observed=True, dropna=False)
+        if self.sql_source is not None:
+            cube = grouped[['Natrackováno', 'Počet záznamů']].sum()
+        else:
+            cube = grouped['Natrackováno'].agg(['sum', 'count'])
+            cube.columns = ['Natrackováno', 'Počet záznamů']
+        cube['Natrackováno'] = cube['Natrackováno'].astype('float64')
+        months = cube.index.get_level_values('Měsíc')
+        if len(cube):
+            working_hours = self.get_working_hours_for_months(months.unique().sort_values())
+            cube['FTE'] = cube['Natrackováno'] / working_hours.reindex(months).to_numpy()
+        else:
+            cube['FTE'] = pd.Series(dtype='float64')
+        return cube
+
+    def get_cube_slice(self, start=None, end=None):
+        """Rows of the cube within start..end months (inclusive)"""
+        cube = self.get_cube()
+        if start is None and end is None:
+            return cube
+        months = cube.index.get_level_values('Měsíc')
+        return cube[months.isin(self.get_months(start, end))]
+
+    @memoized
+    def get_monthly_hours(self, by):
+        """Tracked hours per (month, by) pair, rolled up from the cube"""
+        return self.get_cube()['Natrackováno'].groupby(level=['Měsíc', by], observed=True).sum()
+
+    @memoized
+    def analyze_monthly_fte(self, by='Projekt', start=None, end=None):
+        """FTE of each project/person per month and over the whole selected range"""
+        months = self.get_months(start, end)
+        working_hours = self.get_working_hours_for_months(months)
+
+        monthly_hours = (
+            self.get_monthly_hours(by)
+            .unstack('Měsíc', fill_value=0)
+            .reindex(columns=months, fill_value=0)
+        )
+        monthly_hours = monthly_hours[monthly_hours.sum(axis=1) > 0]
+
+        monthly_fte = (monthly_hours / working_hours).round(2)
+        monthly_fte.columns = monthly_fte.columns.astype(str)
+        monthly_fte['Celkem'] = (monthly_hours.sum(axis=1) / working_hours.sum()).round(2)
+        return monthly_fte
+
+    @memoized
+    def analyze_month_over_month(self, by='Projekt', start=None, end=None):
+        """FTE change of each project/person against the previous month and its linear trend"""
+        monthly_fte = self.analyze_monthly_fte(by, start, end).drop(columns='Celkem')
+        changes = monthly_fte.diff(axis=1).iloc[:, 1:].round(2)
+        changes.columns = [f"Δ {month}" for month in changes.columns]
+
+        # Least squares slope over the months, for all rows at once
+        x = np.arange(monthly_fte.shape[1], dtype=float)
+        x -= x.mean()
+        values = monthly_fte.to_numpy()
+        denominator = (x ** 2).sum()
+        slope = (values - values.mean(axis=1, keepdims=True)) @ x / denominator if denominator else 0.0
+        changes['Trend (FTE/měsíc)'] = np.round(slope, 3) + 0.0  # no -0.0
+        return changes
+
+    @memoized
+    def analyze_by_project(self, start=None, end=None):
+        months = self.get_months(start, end)
+        working_hours = int(self.get_working_hours_for_months(months).sum())
+
+        project_totals = (
+            self.get_cube_slice(start, end)[['Natrackováno', 'Počet záznamů']]
+            .groupby(level='Projekt', observed=True)
+            .sum()
+        )
+        project_analysis = pd.DataFrame({
+            'Celkem hodin': project_totals['Natrackováno'],
+            'Průměr hodin': project_totals['Natrackováno'] / project_totals['Počet záznamů'],
+            'Počet záznamů': project_totals['Počet záznamů'].astype('float64')
+        }).round(2)
+
+        project_analysis['FTE'] = (project_analysis['Celkem hodin'] / working_hours).round(2)
+
+        total_hours = round(project_analysis['Celkem hodin'].sum(), 2)
+        project_analysis['Podíl (%)'] = (project_analysis['Celkem hodin'] / total_hours * 100).round(2)
+
+        total_row = pd.DataFrame({
+            'Celkem hodin': [total_hours],
+            'Průměr hodin': [round(project_analysis['Průměr hodin'].mean(), 2)],
+            'Počet záznamů': [int(project_analysis['Počet záznamů'].sum())],
+            'FTE': [round(project_analysis['FTE'].sum(), 2)],
+            'Podíl (%)': [100.0]
+        }, index=['CELKEM'])
+
+        project_analysis = pd.concat([project_analysis, total_row])
+        project_analysis = project_analysis.round(2)
+        project_analysis['Počet záznamů'] = project_analysis['Počet záznamů'].astype(int)
+        return project_analysis, working_hours, months
+
+    @memoized
+    def get_ops_projects(self):
+        """Team of every OPS project (matching ops_project_pattern), indexed by project"""
+        pattern = re.compile(self.ops_project_pattern, re.IGNORECASE)
+        teams = {}
+        if self.sql_source is not None:
+            store, start, end = self.sql_source
+            projects = store.projects(start, end)
+        else:
+            projects = sorted(self.df['Projekt'].dropna().unique())
+        for project in projects:
+            match = pattern.search(project)
+            if match:
+                teams[project] = (match.groupdict().get('team') or project).strip() or project
+        if not teams:
+            raise ValueError("Nenalezen žádný OPS projekt v datech")
+        return pd.Series(teams, name='Tým', dtype=object).rename_axis('Projekt')
+
+    def get_teams(self):
+        return sorted(self.get_ops_projects().unique())
+
+    def _categories_key(self):
+        return (
+            self.ops_project_pattern,
+            tuple((category, tuple(keywords)) for category, keywords in self.categories.items())
+        )
+
+    def _clear_derived(self):
+        with self._derived_lock:
+            self._derived.clear()
+            self._period_results.clear()
+
+    def _get_derived(self, key, compute, per_period=False):
+        """Compute a derived result once per loaded data, category map and OPS pattern.
+
+        per_period results go to the bounded LRU of PERIOD_RESULTS_ENTRIES.
+        Results are shared between analyses and callers must treat them as read-only.
+        """
+        categories_key = self._categories_key()
+        if categories_key != self._derived_categories_key:
+            self._clear_derived()
+            self._derived_categories_key = categories_key
+        cache = self._period_results if per_period else self._derived
+        with self._derived_lock:
+            if key in cache:
+                if per_period:
+                    cache.move_to_end(key)
+                return cache[key]
+        # Computed outside the lock, the computation itself uses other derived results
+        result = compute()
+        with self._derived_lock:
+            cache[key] = result
+            while len(self._period_results) > PERIOD_RESULTS_ENTRIES:
+                self._period_results.popitem(last=False)
+        return result
+
+    @memoized
+    def get_categorizer(self):
+        return OpsCategorizer(self.categories)
+
+    @memoized
+    def get_ops_mask(self, team=None):
+        """Boolean mask of the OPS rows (of one team), analyses aggregate through it instead of copying them"""
+        projects = self.get_ops_projects()
+        if team is not None:
+            projects = projects[projects == team]
+        return self.df['Projekt'].isin(projects.index).to_numpy()
+
+    @memoized
+    def get_ops_categories(self):
+        """Kategorie of the OPS rows (indexed like them), categorized once per dataset and category map"""
+        return self.get_categorizer().categorize(self.df['Popis'][self.get_ops_mask()])
+
+    @memoized
+    def get_ops_data(self, category=None, team=None, start=None, end=None):
+        """OPS rows with their Kategorie, optionally only one category, team and/or months start..end"""
+        if self.sql_source is not None:
+            projects = self.get_ops_projects()
+            if team is not None:
+                projects = projects[projects == team]
+            rows = self.sql_source[0].load(
+                *self._sql_range(start, end),
+                projects=list(projects.index),
+                categories=self.categories,
+                category=category
+            )
+            return rows.assign(Měsíc=rows['Datum'].dt.to_period('M'))
+
+        mask = self.get_ops_mask()
+        categories = self.get_ops_categories()
+        selected = np.ones(len(categories), dtype=bool)
+        if category is not None:
+            selected &= categories.to_numpy() == category
+        if team is not None:
+            selected &= self.get_ops_mask(team)[mask]
+        if start is not None or end is not None:
+            selected &= self.df['Měsíc'][mask].isin(self.get_months(start, end)).to_numpy()
+        if not selected.all():
+            categories = categories[selected]
+            mask = mask.copy()
+            mask[mask] = selected
+        return self.df[mask].assign(Kategorie=categories)
+
+    @memoized
+    def get_suggester(self):
+        """CategorySuggester trained on the keyword-matched OPS descriptions and the keywords themselves"""
+        if self.sql_source is not None:
+            # fit only uses the unique pairs, so the engine returns just those
+            store, start, end = self.sql_source
+            pairs = store.descriptions(self.categories, start, end, list(self.get_ops_projects().index))
+            ops_descriptions, categories = pairs['Popis'], pairs['Kategorie']
+        else:
+            ops_descriptions, categories = self.df['Popis'][self.get_ops_mask()], self.get_ops_categories()
+        matched = categories.to_numpy() != UNMATCHED_CATEGORY
+        keywords = [(keyword, category) for category, words in self.categories.items() for keyword in words]
+        descriptions = list(ops_descriptions[matched]) + [keyword for keyword, _ in keywords]
+        labels = list(categories[matched]) + [category for _, category in keywords]
+        return CategorySuggester().fit(descriptions, labels)
+
+    @memoized
+    def suggest_categories(self, team=None, start=None, end=None):
+        """Proposed categories for the unmatched OPS descriptions, by tracked hours"""
+        unmatched = self.get_ops_data(UNMATCHED_CATEGORY, team, start, end)
+        summary = (
+            unmatched
+            .groupby(unmatched['Popis'].astype(object), dropna=True)['Natrackováno']
+            .agg(['count', 'sum'])
+        )
+        summary.columns = ['Počet záznamů', 'Celkem hodin']
+        summary['Celkem hodin'] = summary['Celkem hodin'].astype('float64').round(2)
+        proposals = self.get_suggester().suggest(summary.index)
+        proposals.columns = ['Navržená kategorie', 'Podobnost']
+        return proposals.join(summary).sort_values('Celkem hodin', ascending=False)
+
+    def get_ops_hours(self, team=None, start=None, end=None):
+        """OPS hours per (Měsíc, Projekt, Osoba, Kategorie) of one or all teams, sliced from the cube"""
+        projects = self.get_ops_projects()
+        if team is not None:
+            if team not in self.get_teams():
+                raise ValueError(f"Tým {team} nemá žádný OPS projekt")
+            projects = projects[projects == team]
+        hours = self.get_cube_slice(start, end)['Natrackováno']
+        return hours[hours.index.get_level_values('Projekt').isin(projects.index)]
+
+    @memoized
+    def analyze_ops_activities(self, team=None, start=None, end=None):
+        """Hours per OPS category, of one team or all teams together"""
+        category_analysis = (
+            self.get_ops_hours(team, start, end)
+            .groupby(level='Kategorie', observed=True)
+            .sum()
+            .round(2)
+            .to_frame()
+        )
+        category_analysis.index = category_analysis.index.astype(str)
+
+        total_hours = round(category_analysis['Natrackováno'].sum(), 2)
+        category_analysis['Podíl (%)'] = (category_analysis['Natrackováno'] / total_hours * 100).round(2)
+
+        total_row = pd.DataFrame({
+            'Natrackováno': [total_hours],
+            'Podíl (%)': [100.0]
+        }, index=['CELKEM'])
+
+        category_analysis = pd.concat([category_analysis, total_row])
+        category_analysis = category_analysis.round(2)
+        return category_analysis
+
+    @memoized
+    def analyze_ops_by_person(self, team=None, start=None, end=None):
+        """Hours per person and OPS category, of one team or all teams together"""
+        person_category_analysis = (
+            self.get_ops_hours(team, start, end)
+            .groupby(level=['Osoba', 'Kategorie'], observed=True)
+            .sum()
+            .unstack('Kategorie', fill_value=0)
+            .round(2)
+        )
+        person_category_analysis.columns = person_category_analysis.columns.astype(str)
+
+        person_category_analysis['Celkem'] = person_category_analysis.sum(axis=1).round(2)
+        total_hours = round(person_category_analysis['Celkem'].sum(), 2)
+        person_category_analysis['Podíl (%)'] = (person_category_analysis['Celkem'] / total_hours * 100).round(2)
+
+        person_category_analysis = person_category_analysis.round(2)
+        return person_category_analysis
+
+    @memoized
+    def get_daily_hours(self, start=None, end=None):
+        """Hours of every person on every working day of the months start..end (person × day frame)"""
+        months = self.get_months(start, end)
+        calendar = self._ensure_calendar(months[0].year, months[-1].year)
+        working_dates = calendar.working_dates(months[0].start_time, months[-1].end_time)
+        if self.sql_source is not None:
+            entries = self.sql_source[0].daily_hours(*self._sql_range(start, end))
+        else:
+            entries = self.df
+        return daily_hours_matrix(entries['Osoba'], entries['Datum'], entries['Natrackováno'], working_dates)
+
+    @memoized
+    def detect_tracking_anomalies(self, start=None, end=None, window=20):
+        """Per-person summary and list of missing days, days over 8 h and drift, see anomalies.py"""
+        return detect_tracking_anomalies(self.get_daily_hours(start, end), window=window)
+
+    @memoized
+    def get_person_fte(self, start=None, end=None):
+        working_hours = self.get_working_hours_for_months(self.get_months(start, end)).sum()
+        person_hours = (
+            self.get_cube_slice(start, end)['Natrackováno']
+            .groupby(level='Osoba', observed=True)
+            .sum()
+        )
+        person_fte = (person_hours / working_hours).round(2).sort_values()
+        return person_fte
+
+    def save_to_store(self, store):
+        store.append(self.get_rows()[REQUIRED_COLUMNS])
+
+    def load_from_store(self, store, start=None, end=None):
+        self.load_data(store.load(start, end))
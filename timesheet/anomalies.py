@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+from .profiling import traced
+from .working_calendar import HOURS_PER_WORKING_DAY
+
+
+@traced()
+def daily_hours_matrix(people, dates, hours, working_dates):
+    """Hours of every person (rows, sorted) on every working day (columns) in one bincount pass.
+
+    Entries on weekends, holidays, outside working_dates, without a person or
+    without hours are left out, as SQL SUM leaves out NULL hours.
+    """
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    hours = np.asarray(hours, dtype='float64')
+    day_idx = np.searchsorted(working_dates, dates)
+    valid = day_idx < len(working_dates)
+    valid[valid] = working_dates[day_idx[valid]] == dates[valid]
+    people = pd.Series(people)
+    valid &= people.notna().to_numpy() & ~np.isnan(hours)
+
+    person_idx, person_names = pd.factorize(people[valid], sort=True)
+    cells = np.bincount(
+        person_idx * len(working_dates) + day_idx[valid],
+        weights=hours[valid],
+        minlength=len(person_names) * len(working_dates)
+    )
+    return pd.DataFrame(
+        cells.reshape(len(person_names), len(working_dates)),
+        index=pd.Index(np.asarray(person_names, dtype=object), name='Osoba'),
+        columns=pd.DatetimeIndex(working_dates, name='Datum')
+    )
+
+
+def find_runs(mask):
+    """(row, first column, length) of every run of True values in each row of a 2D mask"""
+    rows, columns = mask.shape
+    # A False column between rows keeps runs from spanning two rows
+    padded = np.zeros((rows, columns + 1), dtype=np.int8)
+    padded[:, 1:] = mask
+    edges = np.diff(np.append(padded.ravel(), 0))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return starts // (columns + 1), starts % (columns + 1), ends - starts
+
+
+def rolling_mean(values, active, window):
+    """Mean of values over the active cells of the last window columns, NaN below half a window active"""
+    def rolling_sum(array):
+        cumulative = np.zeros((array.shape[0], array.shape[1] + 1))
+        np.cumsum(array, axis=1, out=cumulative[:, 1:])
+        return cumulative[:, window:] - cumulative[:, :-window] if array.shape[1] >= window else None
+
+    sums = rolling_sum(np.where(active, values, 0.0))
+    if sums is None:
+        return np.full(values.shape, np.nan)
+    counts = rolling_sum(active.astype(float))
+    means = np.full(values.shape, np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means[:, window - 1:] = np.where(counts >= window / 2, sums / counts, np.nan)
+    return means
+
+
+@traced()
+def detect_tracking_anomalies(daily_hours, window=20, max_daily_hours=HOURS_PER_WORKING_DAY, drift_tolerance=1.0):
+    """Missing days, days over max_daily_hours and tracking drift of every person.
+
+    daily_hours is a daily_hours_matrix. A person counts as active from the
+    first to the last day they tracked anything, so joiners and leavers do
+    not show missing days outside that range; the working days after their
+    last tracked day are counted separately, so a person who stopped
+    tracking before the end of the range still stands out. Drift is the mean of the tracked
+    days over the last window working days departing by more than
+    drift_tolerance hours from the person's baseline, the mean of their first
+    window tracked days. Returns a per-person summary and a frame of the
+    anomalies as runs of consecutive working days.
+    """
+    values = daily_hours.to_numpy()
+    tracked = values > 0
+    columns = np.arange(values.shape[1])
+    first = np.where(tracked.any(axis=1), tracked.argmax(axis=1), values.shape[1])
+    last = values.shape[1] - 1 - tracked[:, ::-1].argmax(axis=1)
+    active = (columns >= first[:, None]) & (columns <= last[:, None])
+
+    missing = active & ~tracked
+    overtime = values > max_daily_hours + 1e-9
+    early = tracked & (np.cumsum(tracked, axis=1) <= window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        baseline = np.where(early, values, 0.0).sum(axis=1) / early.sum(axis=1)
+    means = rolling_mean(values, tracked, window)
+    with np.errstate(invalid='ignore'):
+        drift = np.abs(means - baseline[:, None]) > drift_tolerance
+
+    events = []
+    for kind, mask in (('Chybějící dny', missing), (f'Přes {max_daily_hours:g} h', overtime), ('Drift', drift)):
+        rows, starts, lengths = find_runs(mask)
+        hours = means if kind == 'Drift' else values
+        run_hours = np.add.reduceat(hours[mask], np.cumsum(np.append(0, lengths[:-1]))) if len(lengths) else []
+        events.append(pd.DataFrame({
+            'Osoba': daily_hours.index[rows],
+            'Od': daily_hours.columns[starts],
+            'Do': daily_hours.columns[starts + lengths - 1],
+            'Typ': kind,
+            'Pracovních dní': lengths,
+            'Průměr hodin/den': np.round(np.asarray(run_hours, dtype=float) / np.maximum(lengths, 1), 2),
+        }))
+    events = pd.concat(events, ignore_index=True).sort_values(['Osoba', 'Od'], kind='stable', ignore_index=True)
+
+    missing_rows, _, missing_lengths = find_runs(missing)
+    longest_gap = np.zeros(len(values), dtype=int)
+    np.maximum.at(longest_gap, missing_rows, missing_lengths)
+    active_days = active.sum(axis=1)
+    since_last = np.where(tracked.any(axis=1), values.shape[1] - 1 - last, values.shape[1])
+    latest_mean = means[:, -1] if values.shape[1] else np.full(len(values), np.nan)
+    summary = pd.DataFrame({
+        'Aktivní pracovní dny': active_days,
+        'Chybějící dny': missing.sum(axis=1),
+        'Nejdelší výpadek (dny)': longest_gap,
+        'Dny od posledního záznamu': since_last,
+        f'Dny přes {max_daily_hours:g} h': overtime.sum(axis=1),
+        'Max. hodin za den': values.max(axis=1, initial=0).round(2),
+        'Výchozí hodin/den': np.round(baseline, 2),
+        'Drift (h/den)': np.round(latest_mean - baseline, 2),
+        'Dny s driftem': drift.sum(axis=1),
+    }, index=daily_hours.index)
+    return summary, events
@@ -0,0 +1,45 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from .profiling import traced
+
+UNMATCHED_CATEGORY = 'Nespárované'
+
+
+class OpsCategorizer:
+    """Assigns OPS categories to activity descriptions with one compiled regex.
+
+    Every category is a lookahead alternative anchored at the start of the text,
+    so the first category (in dict order) with any matching keyword wins, the
+    same as checking the categories one by one. Each unique description is
+    matched only once.
+    """
+
+    def __init__(self, categories):
+        self.category_names = []
+        alternatives = []
+        for category, keywords in categories.items():
+            if not keywords:
+                continue
+            keyword_pattern = '|'.join(re.escape(keyword.lower()) for keyword in keywords)
+            alternatives.append(f'(?=.*?({keyword_pattern}))')
+            self.category_names.append(category)
+        self.pattern = re.compile(f"^(?:{'|'.join(alternatives)})", re.DOTALL) if alternatives else None
+
+    @traced()
+    def categorize(self, descriptions):
+        codes, unique_descriptions = pd.factorize(descriptions)
+        unique_categories = np.full(len(unique_descriptions), UNMATCHED_CATEGORY, dtype=object)
+
+        if self.pattern is not None and len(unique_descriptions):
+            lowered = pd.Series(unique_descriptions, dtype=object).astype(str).str.lower()
+            matches = lowered.str.extract(self.pattern).notna().to_numpy()
+            matched = matches.any(axis=1)
+            names = np.array(self.category_names, dtype=object)
+            unique_categories[matched] = names[matches[matched].argmax(axis=1)]
+
+        # Missing descriptions are factorized to -1, which picks the appended unmatched label
+        labels = np.append(unique_categories, UNMATCHED_CATEGORY)
+        return pd.Series(labels[codes], index=descriptions.index, name='Kategorie')
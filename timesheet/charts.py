@@ -0,0 +1,221 @@
+import math
+
+import plotly.graph_objects as go
+import plotly.io as pio
+from plotly.subplots import make_subplots
+
+from .profiling import traced
+
+TEXT_COLOR = '#333333'
+
+# Styling shared by all charts, figures only set their own data-dependent layout
+pio.templates['timesheet'] = go.layout.Template(
+    pio.templates['plotly'],
+    data=dict(bar=[go.Bar(textposition='outside', textfont=dict(color=TEXT_COLOR, size=12))]),
+    layout=dict(
+        title=dict(font=dict(color=TEXT_COLOR, size=18)),
+        xaxis=dict(
+            showgrid=True,
+            gridcolor='lightgrey',
+            gridwidth=1,
+            zeroline=True,
+            zerolinecolor='lightgrey',
+            zerolinewidth=1,
+            title=dict(font=dict(color=TEXT_COLOR, size=14)),
+            tickfont=dict(color=TEXT_COLOR, size=12)
+        ),
+        yaxis=dict(
+            showgrid=True,
+            gridcolor='lightgrey',
+            gridwidth=1,
+            tickfont=dict(color=TEXT_COLOR, size=12)
+        ),
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        hoverlabel=dict(bgcolor='white'),
+        font=dict(color=TEXT_COLOR),
+        legend=dict(font=dict(color=TEXT_COLOR, size=12))
+    )
+)
+
+
+@traced()
+def create_bar_chart(x_data, y_data, title, xaxis_title, text_data, main_color='#FF7CAC'):
+    max_value = max(x_data)
+    fig = go.Figure(data=[go.Bar(
+        x=x_data,
+        y=y_data,
+        orientation='h',
+        marker_color=main_color,
+        text=text_data
+    )])
+    fig.update_layout(
+        template='timesheet',
+        title_text=title,
+        xaxis_title=xaxis_title,
+        xaxis_range=[0, max_value * 1.4],
+        margin=dict(l=250, r=500),
+        showlegend=True,
+        width=1200,
+        height=400
+    )
+    return fig
+
+
+@traced()
+def create_comparison_chart(planned_data, actual_data, labels, main_color='#FF7CAC', light_color='#FFD9E5'):
+    max_value = max(max(planned_data), max(actual_data))
+
+    fig = go.Figure(data=[
+        go.Bar(
+            name='Plánovaný FTE',
+            x=planned_data,
+            y=labels,
+            orientation='h',
+            marker_color=light_color,
+            text=[f"{x:.2f} FTE" for x in planned_data]
+        ),
+        go.Bar(
+            name='Skutečný FTE',
+            x=actual_data,
+            y=labels,
+            orientation='h',
+            marker_color=main_color,
+            text=[f"{x:.2f} FTE" for x in actual_data]
+        )
+    ])
+    fig.update_layout(
+        template='timesheet',
+        title_text='Porovnání plánovaného a skutečného FTE',
+        xaxis_title='FTE',
+        xaxis_range=[0, max_value * 1.4],
+        barmode='group',
+        margin=dict(l=250, r=500),
+        showlegend=True,
+        width=1200,
+        height=400
+    )
+    return fig
+
+
+@traced()
+def create_small_multiples_chart(data, title, xaxis_title, columns=2, main_color='#FF7CAC'):
+    """One figure with a horizontal bar subplot for every row of data.
+
+    data is a frame with one row per panel (e.g. person) and one column per bar
+    (e.g. OPS category); all panels share the x axis range.
+    """
+    rows = max(math.ceil(len(data) / columns), 1)
+    fig = make_subplots(
+        rows=rows,
+        cols=columns,
+        subplot_titles=[str(label) for label in data.index],
+        horizontal_spacing=0.2,
+        vertical_spacing=min(0.3 / rows, 0.1)
+    )
+    for i, (label, values) in enumerate(data.iterrows()):
+        fig.add_trace(
+            go.Bar(
+                x=values.values,
+                y=values.index,
+                orientation='h',
+                name=str(label),
+                marker_color=main_color,
+                text=[f"{val:.2f}h" for val in values.values]
+            ),
+            row=i // columns + 1,
+            col=i % columns + 1
+        )
+
+    max_value = max(data.to_numpy().max(), 1) if data.size else 1
+    fig.update_xaxes(range=[0, max_value * 1.4])
+    fig.update_xaxes(title_text=xaxis_title, row=rows)
+    fig.update_layout(
+        template='timesheet',
+        title_text=title,
+        showlegend=False,
+        margin=dict(l=120, r=40),
+        width=1200,
+        height=max(400, rows * 250)
+    )
+    return fig
+
+
+@traced()
+def create_dropdown_bar_chart(data, title, xaxis_title, main_color='#FF7CAC'):
+    """One bar chart per row of data, switched in the browser with a dropdown"""
+    labels = [str(label) for label in data.index]
+    fig = go.Figure()
+    for i, (label, values) in enumerate(data.iterrows()):
+        fig.add_trace(go.Bar(
+            x=values.values,
+            y=values.index,
+            orientation='h',
+            name=str(label),
+            visible=i == 0,
+            marker_color=main_color,
+            text=[f"{val:.2f}h" for val in values.values]
+        ))
+
+    buttons = [
+        dict(
+            label=label,
+            method='update',
+            args=[
+                {'visible': [j == i for j in range(len(labels))]},
+                {'title.text': f'{title} - {label}'}
+            ]
+        )
+        for i, label in enumerate(labels)
+    ]
+    max_value = max(data.to_numpy().max(), 1) if data.size else 1
+    fig.update_layout(
+        template='timesheet',
+        title_text=f'{title} - {labels[0]}' if labels else title,
+        xaxis_title=xaxis_title,
+        xaxis_range=[0, max_value * 1.4],
+        updatemenus=[dict(buttons=buttons, direction='down', x=1, xanchor='right', y=1.15, yanchor='top')],
+        margin=dict(l=250, r=500),
+        width=1200,
+        height=400
+    )
+    return fig
+
+
+@traced()
+def create_trend_chart(data, title, yaxis_title):
+    """One line per row of data (e.g. project) over its columns (months)"""
+    months = [str(month) for month in data.columns]
+    fig = go.Figure()
+    for label, values in data.iterrows():
+        fig.add_trace(go.Scatter(x=months, y=values.values, mode='lines+markers', name=str(label)))
+    fig.update_layout(
+        template='timesheet',
+        title_text=title,
+        yaxis_title=yaxis_title,
+        xaxis_type='category',
+        margin=dict(l=80, r=250),
+        width=1200,
+        height=400
+    )
+    return fig
+
+
+@traced()
+def create_heatmap_chart(data, title, colorbar_title, main_color='#FF7CAC'):
+    """Heatmap of data with rows (e.g. people) on the y axis and columns (e.g. days) on the x axis"""
+    fig = go.Figure(data=go.Heatmap(
+        z=data.to_numpy(),
+        x=data.columns,
+        y=[str(label) for label in data.index],
+        colorscale=[[0, 'white'], [1, main_color]],
+        colorbar=dict(title=colorbar_title)
+    ))
+    fig.update_layout(
+        template='timesheet',
+        title_text=title,
+        margin=dict(l=250, r=80),
+        width=1200,
+        height=max(400, 20 * len(data) + 150)
+    )
+    return fig
@@ -0,0 +1,89 @@
+"""Headless batch mode: one Excel report per Costlocker export in a directory.
+
+    python -m timesheet exports/ reports/ --workers 4
+"""
+import argparse
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import os
+from pathlib import Path
+import sys
+
+from .analyzer import TimesheetAnalyzer
+from .export import export_to_excel
+from .readers import find_exports, read_timesheet
+
+
+def get_report_paths(exports, output_dir):
+    # Exports sharing a name (e.g. leden.xlsx and leden.csv) keep their extension
+    stems = Counter(path.stem for path in exports)
+    return {
+        path: Path(output_dir) / (
+            f"{path.stem}_report.xlsx" if stems[path.stem] == 1
+            else f"{path.stem}_{path.suffix.lstrip('.')}_report.xlsx"
+        )
+        for path in exports
+    }
+
+
+def build_report(input_path, output_path, compact=False, include_raw=False, include_monthly=False):
+    """Analyze one export and write its Excel report, returns the report path"""
+    input_path = Path(input_path)
+    analyzer = TimesheetAnalyzer()
+    analyzer.load_data(read_timesheet(input_path, input_path.suffix), compact=compact)
+
+    try:
+        ops_activities = analyzer.analyze_ops_activities()
+        ops_by_person = analyzer.analyze_ops_by_person()
+    except ValueError:
+        ops_activities = ops_by_person = None
+
+    report = export_to_excel(
+        analyzer, analyzer.get_person_fte(), ops_activities, ops_by_person,
+        include_raw=include_raw, include_monthly=include_monthly
+    )
+    output_path = Path(output_path)
+    output_path.write_bytes(report.getvalue())
+    return output_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m timesheet',
+        description="Vytvoří Excel report pro každý export z Costlocker v adresáři"
+    )
+    parser.add_argument('input_dir', help="Adresář s exporty (.xlsx, .csv)")
+    parser.add_argument('output_dir', help="Adresář pro vytvořené reporty")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="Počet paralelních procesů (výchozí: počet CPU)")
+    parser.add_argument('--compact', action='store_true',
+                        help="Úsporný režim paměti pro velké víceleté exporty")
+    parser.add_argument('--raw', action='store_true',
+                        help="Přidat zdrojová data (list pro každý měsíc)")
+    parser.add_argument('--monthly', action='store_true',
+                        help="Přidat FTE projektů a osob po měsících")
+    args = parser.parse_args(argv)
+
+    exports = find_exports(args.input_dir)
+    if not exports:
+        print(f"V adresáři {args.input_dir} nejsou žádné exporty", file=sys.stderr)
+        return 1
+
+    Path(args.output_dir).mkdir(parents=True, exist_ok=True)
+    workers = min(args.workers or os.cpu_count() or 1, len(exports))
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(build_report, path, report_path, args.compact, args.raw, args.monthly): path
+            for path, report_path in get_report_paths(exports, args.output_dir).items()
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                print(f"{path.name} -> {future.result()}")
+            except Exception as e:
+                failed += 1
+                print(f"{path.name}: {e}", file=sys.stderr)
+
+    return 1 if failed else 0
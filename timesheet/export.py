@@ -0,0 +1,147 @@
+from io import BytesIO
+import zipfile
+
+import pandas as pd
+
+from .profiling import traced
+from .readers import REQUIRED_COLUMNS
+from .rendering import get_chart_renderer
+
+BUNDLE_FORMATS = ['csv', 'parquet']
+
+# Rows converted to plain Python values at a time while streaming a sheet
+WRITE_CHUNK_ROWS = 10_000
+
+
+def get_report_tables(analyzer, person_fte, ops_activities=None, ops_by_person=None, include_monthly=False,
+                      start=None, end=None):
+    """Report tables by sheet name as (frame, write index), OPS tables only when OPS data exist.
+
+    start and end limit the project and monthly tables to those months, the
+    given person and OPS tables are expected to cover the same period.
+    """
+    project_data, _, _ = analyzer.analyze_by_project(start, end)
+
+    person_fte_df = pd.DataFrame({
+        'Osoba': person_fte.index,
+        'FTE': person_fte.values
+    })
+    person_fte_df.loc[len(person_fte_df)] = ['CELKEM', round(person_fte.sum(), 2)]
+    person_fte_df['FTE'] = person_fte_df['FTE'].round(2)
+
+    tables = {
+        'Projekty': (project_data, True),
+        'FTE podle osob': (person_fte_df, False),
+    }
+    if include_monthly:
+        tables['FTE projektů po měsících'] = (analyzer.analyze_monthly_fte('Projekt', start, end), True)
+        tables['FTE osob po měsících'] = (analyzer.analyze_monthly_fte('Osoba', start, end), True)
+    if ops_activities is not None:
+        tables['OPS aktivity'] = (ops_activities, True)
+    if ops_by_person is not None:
+        tables['OPS aktivity podle osob'] = (ops_by_person, True)
+    return tables
+
+
+def _append_frame(sheet, df, index, header_font):
+    from openpyxl.cell import WriteOnlyCell
+
+    columns = ([df.index.name or ''] if index else []) + [str(col) for col in df.columns]
+    header = []
+    for title in columns:
+        cell = WriteOnlyCell(sheet, value=title)
+        cell.font = header_font
+        header.append(cell)
+    sheet.append(header)
+
+    for start in range(0, len(df), WRITE_CHUNK_ROWS):
+        # Write-only sheets take plain values, missing ones stay empty cells
+        chunk = df.iloc[start:start + WRITE_CHUNK_ROWS].astype(object)
+        chunk = chunk.where(chunk.notna(), None)
+        for row in chunk.itertuples(index=index, name=None):
+            sheet.append(row)
+
+
+@traced()
+def export_to_excel(analyzer, person_fte, ops_activities=None, ops_by_person=None,
+                    include_raw=False, include_monthly=False, start=None, end=None):
+    """Write all analyses into an Excel workbook, OPS sheets only when OPS data exist.
+
+    Sheets are streamed row by row through openpyxl's write-only mode, so memory
+    stays flat even with include_raw, which adds the source rows as one sheet
+    per month (a year of data does not fit Excel's row limit in one sheet).
+    include_monthly adds the per-month FTE of projects and people, start and
+    end limit the report to those months.
+    """
+    from openpyxl import Workbook
+    from openpyxl.styles import Font
+
+    workbook = Workbook(write_only=True)
+    header_font = Font(bold=True)
+    tables = get_report_tables(analyzer, person_fte, ops_activities, ops_by_person, include_monthly, start, end)
+    for sheet_name, (df, index) in tables.items():
+        _append_frame(workbook.create_sheet(sheet_name), df, index, header_font)
+
+    if include_raw:
+        raw = analyzer.get_rows(start, end)
+        for month, rows in raw.groupby('Měsíc', sort=True):
+            _append_frame(workbook.create_sheet(f"Data {month}"), rows[REQUIRED_COLUMNS], False, header_font)
+
+    output = BytesIO()
+    workbook.save(output)
+    output.seek(0)
+    return output
+
+
+@traced()
+def export_bundle(analyzer, person_fte, ops_activities=None, ops_by_person=None,
+                  file_format='csv', include_raw=False, include_monthly=False, start=None, end=None):
+    """The report tables (and optionally the source rows) as CSV or Parquet files in a ZIP.
+
+    Much faster and lighter than Excel for large data; each file is written
+    straight into the archive.
+    """
+    if file_format not in BUNDLE_FORMATS:
+        raise ValueError(f"Nepodporovaný formát: {file_format}")
+
+    tables = get_report_tables(analyzer, person_fte, ops_activities, ops_by_person, include_monthly, start, end)
+    if include_raw:
+        tables['Data'] = (analyzer.get_rows(start, end)[REQUIRED_COLUMNS], False)
+
+    output = BytesIO()
+    # Parquet is compressed already, CSV is deflated
+    compression = zipfile.ZIP_STORED if file_format == 'parquet' else zipfile.ZIP_DEFLATED
+    with zipfile.ZipFile(output, 'w', compression) as bundle:
+        for name, (df, index) in tables.items():
+            with bundle.open(f"{name}.{file_format}", 'w') as member:
+                if file_format == 'csv':
+                    df.to_csv(member, index=index, encoding='utf-8')
+                else:
+                    df.to_parquet(member, index=index)
+
+    output.seek(0)
+    return output
+
+
+@traced()
+def export_all_charts_as_zip(figures_dict, renderer=None, progress=None):
+    """Export all plotly figures as PNG images in a ZIP file
+
+    progress, if given, is called as progress(rendered, total) after each image.
+    """
+    renderer = renderer or get_chart_renderer()
+    try:
+        zip_buffer = BytesIO()
+
+        # PNG data is already compressed, so it is stored without deflating
+        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_STORED) as zip_file:
+            # Figures are rendered concurrently and written as they complete
+            for rendered, (filename, img_bytes) in enumerate(renderer.render_all(figures_dict), 1):
+                zip_file.writestr(f"{filename}.png", img_bytes)
+                if progress is not None:
+                    progress(rendered, len(figures_dict))
+
+        zip_buffer.seek(0)
+        return zip_buffer
+    except Exception as e:
+        raise Exception(f"Kaleido/Chrome není k dispozici: {str(e)}")
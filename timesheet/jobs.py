@@ -0,0 +1,63 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+
+class Job:
+    """Background computation whose worker reports its progress"""
+
+    def __init__(self):
+        self.progress = 0.0
+        self.message = ''
+        self.future = None
+
+    def report(self, progress, message=''):
+        self.progress = min(max(progress, 0.0), 1.0)
+        self.message = message
+
+    def done(self):
+        return self.future.done()
+
+    def failed(self):
+        return self.future.done() and self.future.exception() is not None
+
+    def result(self):
+        return self.future.result()
+
+
+class BackgroundJobs:
+    """Runs jobs on a worker pool and keeps finished results by key.
+
+    At most max_entries jobs are kept, least recently used first out. Failed jobs
+    are not kept, so submitting the same key again retries them.
+    """
+
+    def __init__(self, max_workers=2, max_entries=16):
+        self.max_entries = max_entries
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None:
+                self._jobs.move_to_end(key)
+            return job
+
+    def submit(self, key, func, *args, **kwargs):
+        """Start func(job, *args, **kwargs) unless a job for key is running or finished"""
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or job.failed():
+                job = Job()
+                job.future = self._pool.submit(func, job, *args, **kwargs)
+                self._jobs[key] = job
+            self._jobs.move_to_end(key)
+            while len(self._jobs) > self.max_entries:
+                self._jobs.popitem(last=False)
+            return job
+
+    def discard(self, key):
+        with self._lock:
+            self._jobs.pop(key, None)
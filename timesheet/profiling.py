@@ -0,0 +1,164 @@
+import contextlib
+import contextvars
+import cProfile
+import functools
+import importlib.util
+import io
+import json
+import pstats
+import time
+import tracemalloc
+from datetime import datetime
+
+# Profiler collecting spans in the current context, spans are no-ops when unset
+_active_profiler = contextvars.ContextVar('timesheet_profiler', default=None)
+
+PROFILE_MODES = ['cprofile'] + (['pyinstrument'] if importlib.util.find_spec('pyinstrument') else [])
+
+
+class Profiler:
+    """Wall/CPU time (and optionally peak Python memory) of nested named spans.
+
+    Activate it around a piece of work, code inside then records spans with the
+    module-level span() context manager or the traced decorator:
+
+        profiler = Profiler(track_memory=True)
+        with profiler.activate():
+            with span('load'):
+                ...
+        profiler.to_json()
+
+    track_memory uses tracemalloc, which slows Python-heavy code down noticeably.
+    mode ('cprofile' or 'pyinstrument') additionally captures a call profile of
+    the whole activated block.
+    """
+
+    def __init__(self, track_memory=False, mode=None):
+        if mode is not None and mode not in PROFILE_MODES:
+            raise ValueError(f"Nepodporovaný profiler: {mode}")
+        self.track_memory = track_memory
+        self.mode = mode
+        self.spans = []
+        self.profile = None
+        self.started_at = None
+        self._origin = None
+        self._stack = []
+
+    @contextlib.contextmanager
+    def activate(self):
+        self.started_at = datetime.now()
+        self._origin = time.perf_counter()
+        started_tracing = self.track_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        token = _active_profiler.set(self)
+        try:
+            with self._capture():
+                yield self
+        finally:
+            _active_profiler.reset(token)
+            if started_tracing:
+                tracemalloc.stop()
+
+    @contextlib.contextmanager
+    def _capture(self):
+        if self.mode == 'cprofile':
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                yield
+            finally:
+                profile.disable()
+                output = io.StringIO()
+                pstats.Stats(profile, stream=output).sort_stats('cumulative').print_stats(40)
+                self.profile = output.getvalue()
+        elif self.mode == 'pyinstrument':
+            import pyinstrument
+
+            profile = pyinstrument.Profiler()
+            profile.start()
+            try:
+                yield
+            finally:
+                profile.stop()
+                self.profile = profile.output_text(unicode=True)
+        else:
+            yield
+
+    @contextlib.contextmanager
+    def span(self, name):
+        record = {
+            'name': name,
+            'depth': len(self._stack),
+            'start_s': time.perf_counter() - self._origin,
+        }
+        memory = tracemalloc.is_tracing() and self.track_memory
+        if memory:
+            # Fold the peak so far into the open spans before resetting it for this one
+            current, peak = tracemalloc.get_traced_memory()
+            for parent in self._stack:
+                parent['_peak'] = max(parent['_peak'], peak)
+            tracemalloc.reset_peak()
+            record['_start_memory'] = current
+            record['_peak'] = current
+        self._stack.append(record)
+        self.spans.append(record)
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record['duration_s'] = time.perf_counter() - wall
+            record['cpu_s'] = time.process_time() - cpu
+            self._stack.pop()
+            if memory:
+                peak = max(record.pop('_peak'), tracemalloc.get_traced_memory()[1])
+                record['peak_memory_mb'] = (peak - record.pop('_start_memory')) / 2**20
+                if self._stack:
+                    self._stack[-1]['_peak'] = max(self._stack[-1]['_peak'], peak)
+
+    def to_frame(self):
+        import pandas as pd
+
+        columns = ['name', 'depth', 'start_s', 'duration_s', 'cpu_s']
+        if self.track_memory:
+            columns.append('peak_memory_mb')
+        return pd.DataFrame([span for span in self.spans if 'duration_s' in span], columns=columns)
+
+    def to_dict(self):
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds') if self.started_at else None,
+            'track_memory': self.track_memory,
+            'mode': self.mode,
+            'spans': [span for span in self.spans if 'duration_s' in span],
+            'profile': self.profile,
+        }
+
+    def to_json(self):
+        return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
+
+
+def get_active_profiler():
+    return _active_profiler.get()
+
+
+def span(name):
+    """Record a named span on the active profiler, does nothing when none is active"""
+    profiler = _active_profiler.get()
+    if profiler is None:
+        return contextlib.nullcontext()
+    return profiler.span(name)
+
+
+def traced(name=None):
+    """Decorator recording every call of the function as a span"""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _active_profiler.get() is None:
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,167 @@
+import hashlib
+import importlib.util
+from operator import itemgetter
+from pathlib import Path
+
+import pandas as pd
+
+from .profiling import traced
+
+REQUIRED_COLUMNS = ['Datum', 'Projekt', 'Osoba', 'Natrackováno', 'Popis']
+
+
+def get_file_hash(file_bytes):
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+# Dtypes applied while parsing, Datum is converted in normalize_timesheet
+READ_DTYPES = {'Projekt': str, 'Osoba': str, 'Natrackováno': 'float64', 'Popis': str}
+
+
+def get_excel_engine():
+    # python-calamine (Rust) parses xlsx several times faster than openpyxl
+    return 'calamine' if importlib.util.find_spec('python_calamine') else 'openpyxl'
+
+
+def read_excel_streaming(source):
+    """Stream the first sheet with openpyxl in read-only mode, keeping only required columns"""
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, ())
+        positions = [idx for idx, col in enumerate(header) if col in REQUIRED_COLUMNS]
+        columns = [header[idx] for idx in positions]
+        if len(positions) > 1:
+            pick = itemgetter(*positions)
+        else:
+            pick = lambda row: tuple(row[idx] for idx in positions)
+        df = pd.DataFrame.from_records([pick(row) for row in rows], columns=columns)
+    finally:
+        workbook.close()
+
+    df = df.dropna(how='all')
+    for col, dtype in READ_DTYPES.items():
+        if col not in df.columns:
+            continue
+        if dtype is str:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+        else:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def read_excel_timesheet(source):
+    engine = get_excel_engine()
+    if engine == 'openpyxl':
+        return read_excel_streaming(source)
+    return pd.read_excel(
+        source,
+        engine=engine,
+        usecols=lambda col: col in REQUIRED_COLUMNS,
+        dtype=READ_DTYPES
+    )
+
+
+def read_csv_timesheet(source):
+    return pd.read_csv(
+        source,
+        usecols=lambda col: col in REQUIRED_COLUMNS,
+        dtype=READ_DTYPES
+    )
+
+
+# Readers by file extension, each returns a frame with only the required columns
+TIMESHEET_READERS = {
+    'xlsx': read_excel_timesheet,
+    'csv': read_csv_timesheet
+}
+
+
+def find_exports(input_dir):
+    """Exports in a directory by path, Excel's lock files (~$name.xlsx) left out"""
+    return sorted(
+        path for path in Path(input_dir).iterdir()
+        if path.suffix.lower().lstrip('.') in TIMESHEET_READERS
+        and not path.name.startswith('~$')
+    )
+
+
+@traced()
+def read_timesheet(source, file_type='xlsx'):
+    """Read a Costlocker export and normalize it for TimesheetAnalyzer.load_data"""
+    reader = TIMESHEET_READERS.get(file_type.lower().lstrip('.'))
+    if reader is None:
+        raise ValueError(f"Nepodporovaný typ souboru: {file_type}")
+    return normalize_timesheet(reader(source))
+
+
+@traced()
+def normalize_timesheet(df):
+    """Validate columns and normalize dtypes of a Costlocker export"""
+    missing = [col for col in REQUIRED_COLUMNS if col not in df.columns]
+    if missing:
+        raise ValueError(f"Chybí sloupce: {', '.join(missing)}")
+
+    df['Datum'] = pd.to_datetime(df['Datum'])
+    df['Natrackováno'] = pd.to_numeric(df['Natrackováno']).astype('float64')
+    df['Projekt'] = df['Projekt'].astype('category')
+    df['Osoba'] = df['Osoba'].astype('category')
+    return df
+
+
+def with_occurrence(df):
+    """Number repeated identical rows, so overlapping exports deduplicate against
+    each other while genuine repeats inside one export are kept"""
+    return df.assign(_occurrence=df.groupby(REQUIRED_COLUMNS, dropna=False, observed=True).cumcount())
+
+
+def stored_hours(hours):
+    """Natrackováno as the history stores keep it, float64"""
+    if hours.dtype == 'float32':
+        # Hours of a compact analyzer, without the float32 noise
+        return hours.astype('float64').round(6)
+    return hours.astype('float64')
+
+
+@traced()
+def merge_timesheets(frames):
+    """Merge normalized exports into one frame, rows shared by overlapping exports appear once.
+
+    Exports are expected to overlap in whole days (as date-range exports do),
+    identical rows on the same day are then kept as many times as the export
+    with most of them has.
+    """
+    merged = (
+        pd.concat([with_occurrence(frame[REQUIRED_COLUMNS]) for frame in frames], ignore_index=True)
+        .drop_duplicates(REQUIRED_COLUMNS + ['_occurrence'])
+        .drop(columns='_occurrence')
+        .sort_values('Datum', kind='stable', ignore_index=True)
+    )
+    # Categoricals with different categories are concatenated as plain strings
+    merged['Projekt'] = merged['Projekt'].astype('category')
+    merged['Osoba'] = merged['Osoba'].astype('category')
+    return merged
+
+
+def memory_footprint(df):
+    """Bytes held by the frame including the strings it references"""
+    return int(df.memory_usage(deep=True).sum())
+
+
+@traced()
+def compact_timesheet(df):
+    """Smallest in-memory form of a normalized export for large multi-year loads.
+
+    Keeps only the required columns, stores repeated strings (including Popis,
+    which interns every distinct description once) as categoricals and hours as
+    float32. Aggregations upcast their results back to float64.
+    """
+    df = df[REQUIRED_COLUMNS]
+    return df.assign(
+        Projekt=df['Projekt'].astype('category'),
+        Osoba=df['Osoba'].astype('category'),
+        Popis=df['Popis'].astype('category'),
+        Natrackováno=df['Natrackováno'].astype('float32')
+    )
@@ -0,0 +1,124 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import asyncio
+import atexit
+import hashlib
+import threading
+
+IMAGE_WIDTH = 1200
+IMAGE_HEIGHT = 600
+
+
+class KaleidoBrowser:
+    """Chrome instance kept open by kaleido >= 1.0 with one tab per worker.
+
+    kaleido is asyncio based, so the browser lives on a private event loop
+    thread and renders are submitted to it from any thread.
+    """
+
+    def __init__(self, tabs):
+        import kaleido
+
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name='kaleido', daemon=True).start()
+        try:
+            self._browser = self._run(self._open(kaleido, tabs))
+        except Exception:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            raise
+        atexit.register(self.close)
+
+    @staticmethod
+    async def _open(kaleido, tabs):
+        browser = kaleido.Kaleido(n=tabs)
+        await browser.open()
+        return browser
+
+    def _run(self, coroutine, timeout=None):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(timeout)
+
+    def render(self, fig, width, height):
+        opts = dict(format='png', width=width, height=height, scale=1)
+        return self._run(self._browser.calc_fig(fig.to_dict(), opts=opts))
+
+    def close(self):
+        try:
+            self._run(self._browser.close(), timeout=10)
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+class ChartRenderer:
+    """Renders Plotly figures to PNG concurrently, reusing a warm browser.
+
+    Images are cached by a hash of the figure spec, so charts that did not change
+    since the previous rerun are not rendered again.
+    """
+
+    def __init__(self, width=IMAGE_WIDTH, height=IMAGE_HEIGHT, max_workers=4, max_entries=256):
+        self.width = width
+        self.height = height
+        self.max_workers = max_workers
+        self.max_entries = max_entries
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='chart-render')
+        self._browser = None
+        self._browser_checked = False
+
+    def _get_browser(self):
+        with self._lock:
+            if not self._browser_checked:
+                self._browser_checked = True
+                try:
+                    self._browser = KaleidoBrowser(self.max_workers)
+                except Exception:
+                    # Older kaleido or no Chrome: fig.to_image launches its own
+                    # renderer per call (or raises the underlying error)
+                    self._browser = None
+            return self._browser
+
+    def figure_key(self, fig):
+        spec = fig.to_json()
+        return hashlib.sha256(f"{self.width}x{self.height}:{spec}".encode()).hexdigest()
+
+    def render(self, fig):
+        key = self.figure_key(fig)
+        with self._lock:
+            if key in self._images:
+                self._images.move_to_end(key)
+                return self._images[key]
+
+        browser = self._get_browser()
+        if browser is not None:
+            image = browser.render(fig, self.width, self.height)
+        else:
+            image = fig.to_image(format='png', width=self.width, height=self.height)
+
+        with self._lock:
+            self._images[key] = image
+            while len(self._images) > self.max_entries:
+                self._images.popitem(last=False)
+        return image
+
+    def render_all(self, figures_dict):
+        """Yield (name, png_bytes) pairs as soon as each figure is rendered"""
+        futures = {
+            self._pool.submit(self.render, fig): name
+            for name, fig in figures_dict.items()
+        }
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+
+_renderer = None
+_renderer_lock = threading.Lock()
+
+
+def get_chart_renderer():
+    """Process-wide renderer, so the browser and image cache survive reruns"""
+    global _renderer
+    with _renderer_lock:
+        if _renderer is None:
+            _renderer = ChartRenderer()
+        return _renderer
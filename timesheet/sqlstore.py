@@ -0,0 +1,275 @@
+import contextlib
+import importlib.util
+import sqlite3
+from pathlib import Path
+
+import pandas as pd
+
+from .categorizer import UNMATCHED_CATEGORY
+from .profiling import traced
+from .readers import REQUIRED_COLUMNS, stored_hours, with_occurrence
+
+SQL_ENGINES = ['sqlite'] + (['duckdb'] if importlib.util.find_spec('duckdb') else [])
+
+# SQL column of every timesheet column, identifiers stay ASCII for both engines
+SQL_COLUMNS = {
+    'Datum': 'datum',
+    'Projekt': 'projekt',
+    'Osoba': 'osoba',
+    'Natrackováno': 'natrackovano',
+    'Popis': 'popis',
+}
+
+SCHEMA = [
+    """CREATE TABLE IF NOT EXISTS timesheet (
+        datum TEXT NOT NULL,
+        projekt TEXT,
+        osoba TEXT,
+        natrackovano DOUBLE,
+        popis TEXT,
+        occurrence INTEGER NOT NULL
+    )""",
+    # Also the lookup of already stored rows in append
+    "CREATE INDEX IF NOT EXISTS timesheet_datum ON timesheet (datum, osoba, projekt)",
+    "CREATE INDEX IF NOT EXISTS timesheet_osoba ON timesheet (osoba, datum)",
+    "CREATE INDEX IF NOT EXISTS timesheet_projekt ON timesheet (projekt, datum)",
+]
+
+# Rows of the staging table not stored yet (same values and occurrence number)
+INSERT_NEW_ROWS = """
+    INSERT INTO timesheet
+    SELECT s.datum, s.projekt, s.osoba, s.natrackovano, s.popis, s.occurrence
+    FROM staging s
+    WHERE NOT EXISTS (
+        SELECT 1 FROM timesheet t
+        WHERE t.datum = s.datum
+          AND t.projekt IS NOT DISTINCT FROM s.projekt
+          AND t.osoba IS NOT DISTINCT FROM s.osoba
+          AND t.natrackovano IS NOT DISTINCT FROM s.natrackovano
+          AND t.popis IS NOT DISTINCT FROM s.popis
+          AND t.occurrence = s.occurrence
+    )
+    ORDER BY s.datum
+"""
+
+
+def _month_bounds(start=None, end=None):
+    """WHERE clause and parameters limiting datum to start..end months (inclusive), index friendly"""
+    conditions, params = [], []
+    if start is not None:
+        conditions.append("datum >= ?")
+        params.append(pd.Period(start, freq='M').start_time.strftime('%Y-%m-%d'))
+    if end is not None:
+        conditions.append("datum < ?")
+        params.append((pd.Period(end, freq='M') + 1).start_time.strftime('%Y-%m-%d'))
+    return conditions, params
+
+
+def _in_list(column, values):
+    return f"{column} IN ({', '.join('?' * len(values))})", list(values)
+
+
+class SqlTimesheetStore:
+    """Embedded SQL store of historical timesheets (a SQLite or DuckDB file, no server).
+
+    Has the same append/load/months/version interface as TimesheetStore, and
+    additionally runs filters and aggregations in the engine, so an analyzer
+    loaded with TimesheetAnalyzer.load_from_sql reads only aggregated rows
+    instead of years of history. Datum, Osoba and Projekt are indexed.
+    DuckDB is used for ``*.duckdb`` files when installed, SQLite otherwise.
+    """
+
+    def __init__(self, path, engine=None):
+        self.path = Path(path)
+        self.engine = engine or ('duckdb' if self.path.suffix == '.duckdb' else 'sqlite')
+        if self.engine not in SQL_ENGINES:
+            raise ValueError(f"Nepodporovaný SQL engine: {self.engine}")
+        # SQLite's lower() only folds ASCII, Czech keywords need Python's
+        self._lower = 'lower' if self.engine == 'duckdb' else 'unicode_lower'
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            for statement in SCHEMA:
+                connection.execute(statement)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        """A connection per operation, so the store can be shared between threads"""
+        if self.engine == 'duckdb':
+            import duckdb
+
+            connection = duckdb.connect(str(self.path))
+        else:
+            connection = sqlite3.connect(self.path)
+            connection.create_function(
+                'unicode_lower', 1, lambda text: text.lower() if text is not None else None, deterministic=True
+            )
+        try:
+            yield connection
+            connection.commit()
+        finally:
+            connection.close()
+
+    def _query(self, sql, params=()):
+        with self._connect() as connection:
+            if self.engine == 'duckdb':
+                return connection.execute(sql, params).df()
+            return pd.read_sql_query(sql, connection, params=params)
+
+    def months(self, start=None, end=None):
+        conditions, params = _month_bounds(start, end)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        months = self._query(f"SELECT DISTINCT substr(datum, 1, 7) AS month FROM timesheet {where}", params)
+        return sorted(pd.Period(month, freq='M') for month in months['month'])
+
+    def version(self):
+        """Changes whenever rows are added (the store is append-only), usable as a cache key"""
+        return f"{self.path.name}-{int(self._query('SELECT COUNT(*) AS n FROM timesheet')['n'].iloc[0])}"
+
+    @traced()
+    def append(self, df):
+        """Insert rows, skipping rows already stored"""
+        df = with_occurrence(df[REQUIRED_COLUMNS])
+        staging = pd.DataFrame({
+            'datum': pd.to_datetime(df['Datum']).dt.strftime('%Y-%m-%d %H:%M:%S'),
+            'projekt': df['Projekt'].astype(object),
+            'osoba': df['Osoba'].astype(object),
+            'natrackovano': stored_hours(df['Natrackováno']),
+            'popis': df['Popis'].astype(object),
+            'occurrence': df['_occurrence'].astype('int64'),
+        })
+        staging = staging.astype(object).where(staging.notna(), None)
+
+        with self._connect() as connection:
+            if self.engine == 'duckdb':
+                connection.register('staging_frame', staging)
+                connection.execute("CREATE TEMP TABLE staging AS SELECT * FROM staging_frame")
+            else:
+                connection.execute(
+                    "CREATE TEMP TABLE staging (datum TEXT, projekt TEXT, osoba TEXT, "
+                    "natrackovano DOUBLE, popis TEXT, occurrence INTEGER)"
+                )
+                connection.executemany(
+                    "INSERT INTO staging VALUES (?, ?, ?, ?, ?, ?)",
+                    staging.itertuples(index=False, name=None)
+                )
+            connection.execute(INSERT_NEW_ROWS)
+            connection.execute("DROP TABLE staging")
+
+    def _category_case(self, categories):
+        """SQL expression giving the OPS category of popis (or the unmatched one) and its parameters.
+
+        Same rule as OpsCategorizer: the first category (in dict order) with any
+        keyword contained in the lowercased description.
+        """
+        whens, params = [], []
+        for category, keywords in categories.items():
+            if not keywords:
+                continue
+            whens.append(f"WHEN {' OR '.join([f'instr({self._lower}(popis), ?) > 0'] * len(keywords))} THEN ?")
+            params += [keyword.lower() for keyword in keywords] + [category]
+        return f"CASE {' '.join(whens)} ELSE ? END" if whens else "?", params + [UNMATCHED_CATEGORY]
+
+    def _conditions(self, start=None, end=None, projects=None, people=None):
+        conditions, params = _month_bounds(start, end)
+        for column, values in (('projekt', projects), ('osoba', people)):
+            if values is not None:
+                condition, values = _in_list(column, values)
+                conditions.append(condition)
+                params += values
+        return conditions, params
+
+    @traced()
+    def load(self, start=None, end=None, columns=None, projects=None, people=None, categories=None,
+             category=None):
+        """Rows between start and end months (inclusive), optionally only some projects/people.
+
+        With categories (an OPS category map) the rows get their Kategorie,
+        category then keeps only the rows of that one.
+        """
+        columns = columns or REQUIRED_COLUMNS
+        conditions, params = self._conditions(start, end, projects, people)
+        select = [f'{SQL_COLUMNS[column]} AS "{column}"' for column in columns]
+        if categories is not None:
+            case, case_params = self._category_case(categories)
+            select.append(f'{case} AS "Kategorie"')
+            if category is not None:
+                conditions.append(f"{case} = ?")
+                params += case_params + [category]
+            params = case_params + params
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        sql = f"SELECT {', '.join(select)} FROM timesheet {where} ORDER BY datum, rowid"
+        df = self._query(sql, params)
+
+        if 'Datum' in df.columns:
+            df['Datum'] = pd.to_datetime(df['Datum'])
+        if 'Natrackováno' in df.columns:
+            df['Natrackováno'] = df['Natrackováno'].astype('float64')
+        for col in ('Projekt', 'Osoba'):
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+        return df
+
+    def projects(self, start=None, end=None):
+        conditions, params = _month_bounds(start, end)
+        conditions.append("projekt IS NOT NULL")
+        projects = self._query(
+            f"SELECT DISTINCT projekt FROM timesheet WHERE {' AND '.join(conditions)}", params
+        )
+        return sorted(projects['projekt'])
+
+    def daily_hours(self, start=None, end=None):
+        """Hours per Osoba and day, summed up by the engine"""
+        conditions, params = _month_bounds(start, end)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        df = self._query(
+            f'SELECT osoba AS "Osoba", substr(datum, 1, 10) AS "Datum", SUM(natrackovano) AS "Natrackováno" '
+            f'FROM timesheet {where} GROUP BY 1, 2',
+            params
+        )
+        df['Datum'] = pd.to_datetime(df['Datum'])
+        return df
+
+    def descriptions(self, categories, start=None, end=None, projects=None):
+        """Unique Popis values (of some projects) with their Kategorie"""
+        conditions, params = self._conditions(start, end, projects)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        case, case_params = self._category_case(categories)
+        return self._query(
+            f'SELECT DISTINCT popis AS "Popis", {case} AS "Kategorie" FROM timesheet {where}',
+            case_params + params
+        )
+
+    @traced()
+    def aggregate(self, start=None, end=None, ops_projects=(), categories=None):
+        """Hours and record counts per Měsíc, Projekt, Osoba and Kategorie, computed by the engine.
+
+        Kategorie (by the categories map) is set for the rows of ops_projects only.
+        """
+        conditions, params = _month_bounds(start, end)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        if ops_projects and categories is not None:
+            ops_condition, ops_params = _in_list('projekt', ops_projects)
+            case, case_params = self._category_case(categories)
+            kategorie = f"CASE WHEN {ops_condition} THEN {case} END"
+            params = ops_params + case_params + params
+        else:
+            kategorie = "CAST(NULL AS TEXT)"
+        df = self._query(
+            f"""
+            SELECT substr(datum, 1, 7) AS "Měsíc", projekt AS "Projekt", osoba AS "Osoba",
+                   {kategorie} AS "Kategorie",
+                   -- Rows without hours are not counted, like pandas' count in the frame cube
+                   COALESCE(SUM(natrackovano), 0) AS "Natrackováno", COUNT(natrackovano) AS "Počet záznamů"
+            FROM timesheet {where}
+            GROUP BY 1, 2, 3, 4
+            """,
+            params
+        )
+        # Few distinct months, parsed once each
+        codes, months = pd.factorize(df['Měsíc'])
+        df['Měsíc'] = pd.PeriodIndex(months, freq='M')[codes]
+        df['Natrackováno'] = df['Natrackováno'].astype('float64')
+        df['Počet záznamů'] = df['Počet záznamů'].astype('int64')
+        for col in ('Projekt', 'Osoba'):
+            df[col] = df[col].astype('category')
+        return df
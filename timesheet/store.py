@@ -0,0 +1,72 @@
+import os
+from pathlib import Path
+
+import pandas as pd
+
+from .profiling import traced
+from .readers import REQUIRED_COLUMNS, stored_hours, with_occurrence
+
+
+class TimesheetStore:
+    """Local Parquet store of historical timesheets partitioned by month.
+
+    Every month lives in ``<root>/month=YYYY-MM/data.parquet``, so loading a date
+    range reads only the partitions it needs and only the requested columns.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def _partition_path(self, month):
+        return self.root / f'month={month}' / 'data.parquet'
+
+    def months(self):
+        return sorted(
+            pd.Period(path.parent.name.split('=', 1)[1], freq='M')
+            for path in self.root.glob('month=*/data.parquet')
+        )
+
+    def version(self):
+        """Changes whenever any partition is written, usable as a cache key"""
+        stats = [path.stat() for path in self.root.glob('month=*/data.parquet')]
+        return f"{len(stats)}-{max((stat.st_mtime_ns for stat in stats), default=0)}"
+
+    @traced()
+    def append(self, df):
+        """Merge rows into their month partitions, skipping rows already stored"""
+        df = df[REQUIRED_COLUMNS].assign(Natrackováno=stored_hours(df['Natrackováno']))
+        for month, rows in df.groupby(df['Datum'].dt.to_period('M')):
+            path = self._partition_path(month)
+            rows = with_occurrence(rows)
+            if path.exists():
+                stored = with_occurrence(pd.read_parquet(path))
+                rows = pd.concat([stored, rows], ignore_index=True).drop_duplicates(
+                    REQUIRED_COLUMNS + ['_occurrence']
+                )
+            rows = rows.drop(columns='_occurrence').sort_values('Datum', kind='stable')
+
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.tmp')
+            rows.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, path)
+
+    @traced()
+    def load(self, start=None, end=None, columns=None):
+        """Read the partitions between start and end months (inclusive)"""
+        columns = columns or REQUIRED_COLUMNS
+        months = [
+            month for month in self.months()
+            if (start is None or month >= pd.Period(start, freq='M'))
+            and (end is None or month <= pd.Period(end, freq='M'))
+        ]
+        if not months:
+            return pd.DataFrame(columns=columns)
+
+        df = pd.concat(
+            [pd.read_parquet(self._partition_path(month), columns=columns) for month in months],
+            ignore_index=True
+        )
+        for col in ('Projekt', 'Osoba'):
+            if col in df.columns:
+                df[col] = df[col].astype('category')
+        return df
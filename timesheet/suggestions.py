@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+from .profiling import traced
+
+
+def char_ngrams(text, n=3):
+    """Character n-grams of the lowercased text padded with spaces, robust to inflection and typos"""
+    text = f" {' '.join(str(text).lower().split())} "
+    return [text[i:i + n] for i in range(max(len(text) - n + 1, 1))]
+
+
+class CategorySuggester:
+    """Proposes OPS categories for descriptions no keyword matched.
+
+    Descriptions become TF-IDF vectors of character n-grams; every category is
+    the normalized centroid of its (unique) training descriptions and a text is
+    proposed the most cosine-similar category, or None below min_similarity.
+    Pure NumPy, scoring is vectorized over the whole batch, and every unique
+    description is scored only once per fitted model.
+    """
+
+    def __init__(self, n=3, min_similarity=0.2):
+        self.n = n
+        self.min_similarity = min_similarity
+        self.category_names = []
+        self.vocabulary = {}
+        self.idf = None
+        self.centroids = None
+        self._cache = {}
+
+    def _count_matrix(self, texts, grow=False):
+        """Sparse n-gram counts as (row, term, count) arrays, unknown n-grams are skipped unless grow"""
+        rows, terms = [], []
+        for row, text in enumerate(texts):
+            for gram in char_ngrams(text, self.n):
+                term = self.vocabulary.get(gram)
+                if term is None:
+                    if not grow:
+                        continue
+                    term = self.vocabulary[gram] = len(self.vocabulary)
+                rows.append(row)
+                terms.append(term)
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0)
+        pairs, counts = np.unique(
+            np.array(rows, dtype=np.int64) * len(self.vocabulary) + np.array(terms, dtype=np.int64),
+            return_counts=True
+        )
+        return pairs // len(self.vocabulary), pairs % len(self.vocabulary), counts.astype(float)
+
+    def _tfidf(self, rows, terms, counts, n_rows):
+        """Sublinear TF-IDF weights, L2-normalized per row"""
+        weights = (1 + np.log(counts)) * self.idf[terms]
+        norms = np.sqrt(np.bincount(rows, weights=weights ** 2, minlength=n_rows))
+        return weights / norms[rows]
+
+    @traced()
+    def fit(self, descriptions, categories):
+        """Train on already categorized descriptions (each unique pair counts once)"""
+        training = (
+            pd.DataFrame({'text': descriptions, 'category': categories})
+            .dropna()
+            .astype(str)
+            .drop_duplicates()
+        )
+        self.category_names = sorted(training['category'].unique())
+        self.vocabulary = {}
+        self._cache = {}
+        if training.empty:
+            self.centroids = None
+            return self
+
+        texts = training['text'].to_numpy()
+        rows, terms, counts = self._count_matrix(texts, grow=True)
+        document_frequency = np.bincount(terms, minlength=len(self.vocabulary))
+        self.idf = np.log((1 + len(texts)) / (1 + document_frequency)) + 1
+        weights = self._tfidf(rows, terms, counts, len(texts))
+
+        labels = pd.Categorical(training['category'], categories=self.category_names).codes
+        centroids = np.zeros((len(self.category_names), len(self.vocabulary)))
+        np.add.at(centroids, (labels[rows], terms), weights)
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        self.centroids = centroids / np.where(norms > 0, norms, 1)
+        return self
+
+    def _score(self, texts):
+        """Best category index and cosine similarity for each text"""
+        rows, terms, counts = self._count_matrix(texts)
+        similarity = np.zeros((len(texts), len(self.category_names)))
+        if len(rows):
+            weights = self._tfidf(rows, terms, counts, len(texts))
+            contributions = weights[:, None] * self.centroids[:, terms].T
+            for category in range(len(self.category_names)):
+                similarity[:, category] = np.bincount(
+                    rows, weights=contributions[:, category], minlength=len(texts)
+                )
+        return similarity.argmax(axis=1), similarity.max(axis=1)
+
+    @traced()
+    def suggest(self, descriptions):
+        """Frame indexed by unique description with the proposed Kategorie and its Podobnost"""
+        unique_descriptions = pd.unique(pd.Series(descriptions, dtype=object).dropna().astype(str))
+        if self.centroids is None:
+            return pd.DataFrame(
+                {'Kategorie': None, 'Podobnost': 0.0},
+                index=pd.Index(unique_descriptions, name='Popis')
+            )
+
+        missing = [text for text in unique_descriptions if text not in self._cache]
+        if missing:
+            best, similarity = self._score(missing)
+            names = np.array(self.category_names, dtype=object)
+            proposed = np.where(similarity >= self.min_similarity, names[best], None)
+            self._cache.update(zip(missing, zip(proposed, similarity.round(3))))
+
+        proposals = [self._cache[text] for text in unique_descriptions]
+        return pd.DataFrame(
+            proposals,
+            columns=['Kategorie', 'Podobnost'],
+            index=pd.Index(unique_descriptions, name='Popis')
+        )
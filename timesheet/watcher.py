@@ -0,0 +1,162 @@
+from datetime import datetime
+from pathlib import Path
+import threading
+import time
+
+from .analyzer import TimesheetAnalyzer
+from .categorizer import UNMATCHED_CATEGORY
+from .profiling import traced
+from .readers import find_exports, get_file_hash, merge_timesheets, read_timesheet
+
+
+@traced()
+def warm_up(analyzer):
+    """Compute the analyses the dashboard shows first, for all data and for the latest month.
+
+    Calls use the same positional arguments as the app, so they hit the same
+    memoized results.
+    """
+    months = list(analyzer.get_months())
+    periods = [(None, None)] + ([(str(months[-1]), str(months[-1]))] if months else [])
+    for start, end in periods:
+        analyzer.analyze_by_project(start, end)
+        analyzer.get_person_fte(start, end)
+        for by in ('Projekt', 'Osoba'):
+            analyzer.analyze_monthly_fte(by, start, end)
+            analyzer.analyze_month_over_month(by, start, end)
+        analyzer.get_daily_hours(start, end)
+        analyzer.detect_tracking_anomalies(start, end)
+        try:
+            teams = analyzer.get_teams()
+        except ValueError:
+            continue
+        for team in [None] + teams:
+            analyzer.analyze_ops_activities(team, start, end)
+            analyzer.analyze_ops_by_person(team, start, end)
+            analyzer.get_ops_data(UNMATCHED_CATEGORY, team, start, end)
+            analyzer.suggest_categories(team, start, end)
+
+
+class FolderWatcher:
+    """Background thread ingesting the Costlocker exports dropped into a folder.
+
+    Every interval seconds the folder is listed; new and changed exports are
+    parsed (each file once per version), merged with the others into a fresh
+    analyzer whose main analyses are computed by warm_up, and only then
+    published, so readers always see a complete analyzer. A file is picked up
+    once its size and modification time stayed the same for one interval,
+    so half-copied exports are not read. With a store, changed exports are
+    also appended to it.
+    """
+
+    def __init__(self, folder, interval=30.0, store=None, compact=False):
+        self.folder = Path(folder)
+        self.interval = interval
+        self.store = store
+        self.compact = compact
+        self.data_key = None
+        self.analyzer = None
+        self.files = []
+        self.updated_at = None
+        self.error = None
+        self.errors = {}
+        self._frames = {}
+        self._signatures = {}
+        self._seen = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def current(self):
+        """(data_key, analyzer) of the latest ingested exports, (None, None) before the first one"""
+        with self._lock:
+            return self.data_key, self.analyzer
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='folder-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while True:
+            self.poll()
+            if self._stopped.wait(self.interval):
+                break
+
+    def _ready_files(self):
+        """Signature (mtime, size) of every export that is not being written any more"""
+        ready = {}
+        seen = {}
+        now = time.time()
+        for path in find_exports(self.folder):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            signature = (stat.st_mtime_ns, stat.st_size)
+            seen[path] = signature
+            if self._seen.get(path) == signature or now - stat.st_mtime_ns / 1e9 >= self.interval:
+                ready[path] = signature
+        self._seen = seen
+        return ready
+
+    def poll(self):
+        """Ingest the folder once, returns whether the published data changed"""
+        try:
+            return self._ingest(self._ready_files())
+        except Exception as e:
+            self.error = str(e)
+            return False
+
+    @traced()
+    def _ingest(self, ready):
+        removed = [path for path in self._signatures if path not in self._seen]
+        changed = {path: signature for path, signature in ready.items() if self._signatures.get(path) != signature}
+        if not changed and not removed:
+            return False
+
+        # Worked on copies, kept only once the new data is published, so a failing
+        # store or analysis leaves the files changed and the next poll retries them
+        signatures, frames, errors = dict(self._signatures), dict(self._frames), dict(self.errors)
+        for path in removed:
+            del signatures[path]
+            frames.pop(path, None)
+            errors.pop(path.name, None)
+        new_frames = []
+        for path, signature in changed.items():
+            signatures[path] = signature
+            try:
+                frames[path] = read_timesheet(path, path.suffix)
+            except Exception as e:
+                # Retried once the file changes again
+                frames.pop(path, None)
+                errors[path.name] = str(e)
+                continue
+            errors.pop(path.name, None)
+            new_frames.append(frames[path])
+
+        analyzer = None
+        if frames:
+            analyzer = TimesheetAnalyzer()
+            analyzer.load_data(merge_timesheets(list(frames.values())), compact=self.compact)
+            if self.store is not None and new_frames:
+                self.store.append(merge_timesheets(new_frames))
+            warm_up(analyzer)
+
+        key = sorted((path.name, *signatures[path]) for path in frames)
+        with self._lock:
+            self.data_key = f"watch:{get_file_hash(repr(key).encode())}" if analyzer else None
+            self.analyzer = analyzer
+            self.files = sorted(path.name for path in frames)
+            self.updated_at = datetime.now()
+            self.errors = errors
+            self.error = None
+        self._signatures, self._frames = signatures, frames
+        return True
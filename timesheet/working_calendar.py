@@ -0,0 +1,66 @@
+import functools
+
+import numpy as np
+import pandas as pd
+
+HOURS_PER_WORKING_DAY = 8
+
+
+@functools.lru_cache(maxsize=None)
+def get_holidays(year):
+    """Czech public holidays of a year, built once per process and shared by all calendars"""
+    import holidays
+
+    return tuple(sorted(holidays.CZ(years=year)))
+
+
+class WorkingCalendar:
+    """Czech working-day calendar for a range of years.
+
+    Holidays are materialized once for the whole range and a cumulative count
+    of working days turns any month or date range lookup into O(1) indexing.
+    """
+
+    def __init__(self, start_year, end_year):
+        self.start_year = start_year
+        self.end_year = end_year
+        self.holidays = np.array(
+            [day for year in range(start_year, end_year + 1) for day in get_holidays(year)], dtype='datetime64[D]'
+        )
+        self.busdaycal = np.busdaycalendar(weekmask='1111100', holidays=self.holidays)
+
+        self._first_day = np.datetime64(f'{start_year}-01-01', 'D')
+        days = np.arange(self._first_day, np.datetime64(f'{end_year + 1}-01-01', 'D'))
+        is_working_day = np.is_busday(days, busdaycal=self.busdaycal)
+        # Number of working days strictly before each day of the range
+        self._cumulative = np.concatenate(([0], np.cumsum(is_working_day)))
+
+    def covers(self, start_year, end_year):
+        return self.start_year <= start_year and end_year <= self.end_year
+
+    def working_days(self, start, end):
+        """Working days between start and end (inclusive), scalars or arrays"""
+        start_idx = (np.asarray(start, dtype='datetime64[D]') - self._first_day).astype(np.int64)
+        end_idx = (np.asarray(end, dtype='datetime64[D]') - self._first_day).astype(np.int64) + 1
+        if np.any(start_idx < 0) or np.any(end_idx >= len(self._cumulative)):
+            raise ValueError(
+                f"Datum mimo rozsah kalendáře {self.start_year}–{self.end_year}"
+            )
+        return self._cumulative[end_idx] - self._cumulative[start_idx]
+
+    def working_dates(self, start, end):
+        """All working days between start and end (inclusive) as a datetime64[D] array"""
+        days = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1)
+        return days[np.is_busday(days, busdaycal=self.busdaycal)]
+
+    def working_hours(self, start, end):
+        return self.working_days(start, end) * HOURS_PER_WORKING_DAY
+
+    def working_hours_for_month(self, year, month):
+        period = pd.Period(year=year, month=month, freq='M')
+        return int(self.working_hours(period.start_time, period.end_time))
+
+    def working_hours_for_periods(self, periods):
+        """Working hours for each monthly period, computed as one array operation"""
+        periods = pd.PeriodIndex(periods, freq='M')
+        return self.working_hours(periods.start_time.values, periods.end_time.values)
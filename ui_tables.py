@@ -0,0 +1,70 @@
+"""Streamlit table rendering of the app, kept out of the Streamlit-free ``timesheet`` core."""
+import math
+
+import pandas as pd
+import streamlit as st
+
+# Frames longer than this are sorted, filtered and paged on the server
+PAGE_SIZE = 50
+
+
+def get_column_config(df, decimals=2):
+    """Display formats applied by the browser, the data keep their numeric dtypes"""
+    column_config = {}
+    for col in df.columns:
+        if pd.api.types.is_float_dtype(df[col]):
+            column_config[col] = st.column_config.NumberColumn(format=f"%.{decimals}f")
+        elif pd.api.types.is_datetime64_any_dtype(df[col]):
+            column_config[col] = st.column_config.DateColumn(format="YYYY-MM-DD")
+    return column_config
+
+
+def filter_rows(df, query):
+    """Rows where any text column contains query (case-insensitive)"""
+    mask = pd.Series(False, index=df.index)
+    for col in df.columns:
+        if not pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            mask |= df[col].astype(str).str.contains(query, case=False, regex=False, na=False)
+    return df[mask]
+
+
+def table_view(df, query, sort_col, ascending):
+    """Rows of df matching query sorted by sort_col, which may also be an index level"""
+    labels = [name for name in df.index.names if name is not None]
+    # Index levels (Osoba, Popis, Projekt...) are filtered and sorted like columns
+    view = df.reset_index() if labels else df
+    view = filter_rows(view, query) if query else view
+    view = view.sort_values(sort_col, ascending=ascending, kind='stable')
+    return view.set_index(labels) if labels else view
+
+
+def render_table(df, key, page_size=PAGE_SIZE, default_sort=None, hide_index=False):
+    """Render a table with formatting at render time, paging large frames.
+
+    Small frames are shown whole in a (virtualized) st.dataframe; larger ones get
+    filter, sort and page controls and only the current page is sent to the browser.
+    """
+    column_config = get_column_config(df)
+    if len(df) <= page_size:
+        st.dataframe(df, column_config=column_config, hide_index=hide_index, use_container_width=True)
+        return
+
+    col1, col2, col3 = st.columns([2, 2, 1])
+    query = col1.text_input("Filtr", key=f"{key}_filter", placeholder="Hledat v textu...")
+    columns = [name for name in df.index.names if name is not None] + list(df.columns)
+    sort_col, ascending = default_sort or (df.columns[0], True)
+    sort_col = col2.selectbox("Řadit podle", columns, index=columns.index(sort_col), key=f"{key}_sort")
+    ascending = col3.selectbox(
+        "Pořadí", [True, False], index=0 if ascending else 1, key=f"{key}_order",
+        format_func=lambda value: "Vzestupně" if value else "Sestupně"
+    )
+
+    view = table_view(df, query, sort_col, ascending)
+
+    pages = max(math.ceil(len(view) / page_size), 1)
+    page = st.number_input("Stránka", min_value=1, max_value=pages, value=1, key=f"{key}_page")
+    start = (min(page, pages) - 1) * page_size
+    page_rows = view.iloc[start:start + page_size]
+
+    st.dataframe(page_rows, column_config=column_config, hide_index=hide_index, use_container_width=True)
+    st.caption(f"Záznamy {start + 1 if len(view) else 0}–{start + len(page_rows)} z {len(view)} (stránka {page}/{pages})")